@@ -1,6 +1,10 @@
 from tpi_controller2 import TPIController
+import array
+import contextlib
+import os
 import time
 import struct
+import sys
 
 # Configuration parameters
 PORT = "COM5"
@@ -30,9 +34,17 @@ DWELL_MS = 20
 AUTO_RF = True
 MAX_POINTS_PER_PACKET = 40
 AVERAGES_PER_POINT = 8    #1-8 permitted
-CAPTURE_DURATION = 0.1
+CAPTURE_DURATION = 0.1    # Longest wait for more bytes of a packet, per capture
 NUM_CAPTURES = 60
 
+# Analyzer stopped packet that ends every sweep
+END_SENTINEL = b'\xAA\x55\x00\x02\x07\x3F\xB7'
+
+# Per-capture dumps; set TPI_DEBUG=1 to enable without editing the script
+DEBUG = os.environ.get("TPI_DEBUG") == "1"
+# Optional binary dump of every capture (4-byte little-endian length, then the raw bytes)
+RAW_DUMP_PATH = os.environ.get("TPI_RAW_DUMP")
+
 def calculate_num_points(start_khz, stop_khz, step_khz):
     num_points = (stop_khz - start_khz) / step_khz + 1
     if not num_points.is_integer():
@@ -49,7 +61,6 @@ def main():
     print("Enabling user mode...")
     tpi.enable_user_control()
 
-    all_raw_data = bytearray()  # Create an empty bytearray to store all captures
 
 
     print(f"Setting RF power to {RF_POWER_DBM} dBm...")
@@ -69,8 +80,15 @@ def main():
         averages_per_point=AVERAGES_PER_POINT
     )
 
-    print("Confirming Analyzer parameters:")
-    params = tpi.read_analyzer_parameters_v2()
+    # Preallocate the accumulation buffer for the whole sweep (4 bytes per point plus slack)
+    # and fill it through a memoryview instead of growing it capture by capture
+    all_raw_data = bytearray(num_points_calc * 4 + 128)
+    raw_view = memoryview(all_raw_data)
+    write_ptr = 0
+
+    print("Analyzer parameters:")
+    # The controller keeps what was just sent, so no readback round trip is needed
+    params = tpi.last_params
     for k, v in params.items():
         print(f"{k}: {v}")
 
@@ -92,28 +110,72 @@ def main():
     print("Receiving analyzer data...")
     print(f"Capturing raw data {NUM_CAPTURES} times... -this is some arbitrary duration- that is long enough - loop stops when it RXs analyzer stopped")
 
-    for i in range(NUM_CAPTURES):
-        start_time = time.time()
-        raw_data = tpi.capture_analyzer_raw(duration=CAPTURE_DURATION)
-        elapsed = time.time() - start_time
-        if len(raw_data) > 0:  # Only print if bytes were captured
-            print(f"\nCapture #{i + 1}:")
-            print(f"Captured {len(raw_data)} bytes in {elapsed:.2f} seconds")
-            print(raw_data.hex())
-
-            # Remove preamble (first 11 bytes) and checksum (last byte)
-            if len(raw_data) > 12:  # Only process if packet is long enough
-                processed_data = raw_data[11:-1]  # Remove preamble and checksum
-                all_raw_data.extend(processed_data)
-
-            # Check if last 2 bytes are 3fb7
-            if len(raw_data) >= 7 and raw_data[-7:].hex() == "aa550002073fb7":
-                print("Found packet ending with aa550002073fb7, exiting...")
-                # Remove the sequence from all_raw_data if it exists at the end
-                if len(all_raw_data) >= 7:
-                    all_raw_data = all_raw_data[:-7]
-
-                break
+    # Per-capture timings and (when debugging) raw captures, reported after the loop
+    capture_ns = array.array('q', bytes(8 * NUM_CAPTURES))
+    captures = [None] * NUM_CAPTURES
+    stopped = False
+    n_captures = 0
+    total_bytes = 0
+
+    # Opened once around the loop, so it is closed even if a capture raises;
+    # raw bytes are written as-is, no hex formatting
+    with open(RAW_DUMP_PATH, "wb") if RAW_DUMP_PATH else contextlib.nullcontext() as dump_fp:
+        for i in range(NUM_CAPTURES):
+            start_ns = time.perf_counter_ns()
+            raw_data = tpi.capture_analyzer_packet(timeout=CAPTURE_DURATION)
+            capture_ns[i] = time.perf_counter_ns() - start_ns
+            raw_len = len(raw_data)
+            n_captures += 1
+            total_bytes += raw_len
+            if raw_len > 0:  # An empty capture is a timeout with nothing to record
+                if DEBUG:
+                    captures[i] = raw_data
+                if dump_fp is not None:
+                    dump_fp.write(struct.pack('<I', raw_len))
+                    dump_fp.write(raw_data)
+
+                # Each capture is one whole packet; the analyzer stopped packet ends the sweep
+                if raw_data == END_SENTINEL:
+                    stopped = True
+                    break
+
+                # Data packet: remove preamble (first 11 bytes) and checksum (last byte)
+                if raw_data[4:6] == b'\x07\x3E' and raw_len > 12:
+                    end = write_ptr + raw_len - 12
+                    if end > len(all_raw_data):
+                        # More data than expected: grow the buffer before writing
+                        raw_view.release()
+                        all_raw_data.extend(bytes(end - len(all_raw_data)))
+                        raw_view = memoryview(all_raw_data)
+                    raw_view[write_ptr:end] = memoryview(raw_data)[11:-1]  # Remove preamble and checksum
+                    write_ptr = end
+
+    if RAW_DUMP_PATH:
+        print(f"Raw captures written to {RAW_DUMP_PATH}")
+
+    # One summary line instead of per-capture output (TPI_DEBUG=1 adds the full dumps)
+    print(f"{n_captures} captures, mean {sum(capture_ns[:n_captures]) / max(n_captures, 1) / 1e6:.2f} ms, "
+          f"total {total_bytes} B")
+
+    # Dump the captures only now, so formatting and console output stay out of the capture loop
+    if DEBUG:
+        # Build the whole dump as bytes and hand it to stdout in one write
+        out = bytearray()
+        for i, raw_data in enumerate(captures):
+            if raw_data:
+                out += f"\nCapture #{i + 1}:\n".encode()
+                out += f"Captured {len(raw_data)} bytes in {capture_ns[i] / 1e9:.2f} seconds\n".encode()
+                out += raw_data.hex().encode()
+                out.append(0x0A)
+        if stopped:
+            out += b"Found packet aa550002073fb7, exiting...\n"
+        sys.stdout.flush()
+        sys.stdout.buffer.write(out)
+        sys.stdout.flush()
+
+    # Trim the buffer to the bytes actually written
+    raw_view.release()
+    del all_raw_data[write_ptr:]
 
     print("\nComplete accumulated data (with preambles and checksums removed):")
     print(f"Total bytes captured: {len(all_raw_data)}")
@@ -129,27 +191,23 @@ def main():
 
     tpi.close()
     # Convert accumulated data to float values
-    float_values = []
-    # Process data in chunks of 4 bytes
-    for i in range(0, len(all_raw_data), 4):
-        if i + 4 <= len(all_raw_data):  # Make sure we have 4 complete bytes
-            # '<f' format string means:
-            # < : little-endian (LSB first)
-            # f : 32-bit float (4 bytes)
-            float_val = struct.unpack('<f', all_raw_data[i:i + 4])[0]
-            float_values.append(float_val)
-
+    # Walk the buffer once in C; any trailing partial value is dropped
+    # '<f' format string means:
+    # < : little-endian (LSB first)
+    # f : 32-bit float (4 bytes)
+    n_aligned = len(all_raw_data) & ~3
+    float_values = [v for (v,) in struct.iter_unpack('<f', all_raw_data[:n_aligned])]
+
+    # Each table is built as one string and printed with a single write
     print("\nConverted float values:")
-    for i, value in enumerate(float_values):
-        print(f"Value {i + 1}: {value}")
+    print("\n".join(f"Value {i + 1}: {value}" for i, value in enumerate(float_values)))
 
     print("\nConverted values with frequencies:")
     print("Frequency (kHz)    Level (dBm)")
     print("--------------------------------")
-    for i, value in enumerate(float_values):
-        # Calculate the frequency for this point
-        freq = START_KHZ + (i * STEP_KHZ)
-        print(f"{freq:10d} kHz    {value:8.2f} dBm")
+    # Frequency of point i is START_KHZ + i * STEP_KHZ
+    print("\n".join(f"{START_KHZ + i * STEP_KHZ:10d} kHz    {value:8.2f} dBm"
+                    for i, value in enumerate(float_values)))
 
 
 
@@ -1,41 +1,34 @@
-from tpi_controller2 import TPIController
-import time
-import struct
-from typing import List, Tuple, Optional
-from scipy.interpolate import CubicSpline, interp1d
+# FrequencyScanner is also imported from here by Test GUI.py
+from tpi_scan import NUMBA_AVAILABLE, FrequencyScanner, Scan, from_tuples, njit, scan, to_tuples
+import bisect
+import functools
+import math
+from typing import List, Tuple, Optional, Union
+from scipy.interpolate import CubicSpline, PPoly
 import numpy as np
 
 
-def calculate_num_points(start_khz, stop_khz, step_khz):
-    """Calculate the number of points for frequency scanning"""
-    verbose = False
-    num_points = (stop_khz - start_khz) / step_khz + 1
-    if not num_points.is_integer():
-        raise ValueError(f"The calculated number of points ({num_points}) must be an integer. "
-                         f"Please adjust frequency parameters accordingly.")
-    if verbose:
-        print(f"Calculated number of points: {num_points}")
-    return int(num_points)
-
-
-def find_min_vswr_frequency(vswr_data: list, start_khz: int, stop_khz: int) -> tuple:
+def find_min_vswr_frequency(vswr_data, start_khz: int, stop_khz: int) -> tuple:
     """
     Find the frequency with the lowest VSWR value within the specified range
 
     Args:
-        vswr_data: List of tuples containing (frequency, vswr) pairs
+        vswr_data: Scan or list of tuples containing (frequency, vswr) pairs
         start_khz: Start frequency in kHz
         stop_khz: Stop frequency in kHz
 
     Returns:
         Tuple of (frequency, vswr) with the lowest VSWR value in the range
     """
-    # Filter data points to only those within the specified range
-    valid_points = [(f, v) for f, v in vswr_data if start_khz <= f <= stop_khz]
+    freqs, vswr = vswr_data if isinstance(vswr_data, Scan) else from_tuples(vswr_data)
+
+    # Indices of the data points within the specified range
+    valid = np.flatnonzero((freqs >= start_khz) & (freqs <= stop_khz))
 
-    # Return the point with minimum VSWR
-    if valid_points:
-        return min(valid_points, key=lambda x: x[1])
+    # Return the point with minimum VSWR (the first one on ties)
+    if valid.size:
+        idx = valid[np.argmin(vswr[valid])]
+        return (freqs[idx].item(), vswr[idx].item())
     return (start_khz, 5.0)  # Fallback if no valid points found
 
 
@@ -45,121 +38,284 @@ def get_vswr_at_frequency(frequency, vswr_data):
 
     Args:
         frequency: The frequency to look up
-        vswr_data: List of tuples containing (frequency, vswr) pairs
+        vswr_data: Scan or list of tuples containing (frequency, vswr) pairs,
+            normally sorted by frequency
 
     Returns:
-        VSWR value at the specified frequency
+        VSWR value at the specified frequency; KeyError if there is no point at that frequency
+    """
+    if isinstance(vswr_data, Scan):
+        idx = int(np.searchsorted(vswr_data.freqs, frequency))
+        if idx < len(vswr_data.freqs) and vswr_data.freqs[idx] == frequency:
+            return vswr_data.vals[idx]
+        raise KeyError(f"No VSWR value at {frequency} kHz")
+
+    # Binary search on sorted data: (frequency,) orders before any (frequency, vswr)
+    idx = bisect.bisect_left(vswr_data, (frequency,))
+    if idx < len(vswr_data) and vswr_data[idx][0] == frequency:
+        return vswr_data[idx][1]
+
+    # Unsorted input: fall back to a linear scan
+    for freq, vswr in vswr_data:
+        if freq == frequency:
+            return vswr
+    raise KeyError(f"No VSWR value at {frequency} kHz")
+
+
+# Below this many points the spline system is solved with _thomas_solve rather than LAPACK
+THOMAS_MAX_POINTS = 256
+
+
+@njit(cache=True)
+def _thomas_solve(lower: np.ndarray, diag: np.ndarray, upper: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """
+    Solve a tridiagonal system with the Thomas algorithm (forward elimination, back substitution).
+    lower[i] multiplies x[i - 1] and upper[i] multiplies x[i + 1] in row i.
+    """
+    n = diag.shape[0]
+    c = np.empty(n)
+    d = np.empty(n)
+    inv = 1.0 / diag[0]
+    c[0] = upper[0] * inv
+    d[0] = rhs[0] * inv
+    for i in range(1, n):
+        inv = 1.0 / (diag[i] - lower[i] * c[i - 1])
+        c[i] = upper[i] * inv
+        d[i] = (rhs[i] - lower[i] * d[i - 1]) * inv
+    for i in range(n - 2, -1, -1):
+        d[i] -= c[i] * d[i + 1]
+    return d
+
+
+def _not_a_knot_spline(x: np.ndarray, y: np.ndarray) -> PPoly:
+    """
+    Cubic spline with not-a-knot end conditions (CubicSpline's default), with the
+    slope system solved by _thomas_solve. Needs at least 4 strictly increasing points.
+    """
+    dx = np.diff(x)
+    slope = np.diff(y) / dx
+    n = x.shape[0]
+
+    lower = np.zeros(n)
+    diag = np.empty(n)
+    upper = np.zeros(n)
+    rhs = np.empty(n)
+
+    # Interior rows: continuity of the second derivative
+    lower[1:-1] = dx[1:]
+    diag[1:-1] = 2.0 * (dx[:-1] + dx[1:])
+    upper[1:-1] = dx[:-1]
+    rhs[1:-1] = 3.0 * (dx[1:] * slope[:-1] + dx[:-1] * slope[1:])
+
+    # Not-a-knot: third derivative continuous across the second and second-to-last knots
+    d = x[2] - x[0]
+    diag[0] = dx[1]
+    upper[0] = d
+    rhs[0] = ((dx[0] + 2.0 * d) * dx[1] * slope[0] + dx[0] ** 2 * slope[1]) / d
+    d = x[-1] - x[-3]
+    diag[-1] = dx[-2]
+    lower[-1] = d
+    rhs[-1] = (dx[-1] ** 2 * slope[-2] + (2.0 * d + dx[-1]) * dx[-2] * slope[-1]) / d
+
+    s = _thomas_solve(lower, diag, upper, rhs)
+
+    # Hermite form to piecewise polynomial coefficients (highest power first)
+    t = (s[:-1] + s[1:] - 2.0 * slope) / dx
+    coeffs = np.empty((4, n - 1))
+    coeffs[0] = t / dx
+    coeffs[1] = (slope - s[:-1]) / dx - t
+    coeffs[2] = s[:-1]
+    coeffs[3] = y[:-1]
+    return PPoly(coeffs, x, extrapolate=True)
+
+
+@functools.lru_cache(maxsize=8)
+def _build_spline(freqs: Tuple[int, ...], values: Tuple[float, ...]) -> PPoly:
+    """
+    Build (or reuse) the cubic spline through the given points.
+    Repeated calls with the same scan data return the cached spline.
+    """
+    x = np.asarray(freqs, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float64)
+    if 4 <= x.size < THOMAS_MAX_POINTS and np.all(np.diff(x) > 0) and np.all(np.isfinite(y)):
+        return _not_a_knot_spline(x, y)
+    return CubicSpline(x, y, extrapolate=True)
+
+
+@njit(cache=True)
+def _eval_cubic(x: np.ndarray, c: np.ndarray, xnew: np.ndarray) -> np.ndarray:
+    """
+    Evaluate piecewise cubic coefficients c (PPoly layout, highest power first) at xnew.
+    Points outside x are extrapolated from the first/last interval, as PPoly does.
+    """
+    last = x.shape[0] - 2
+    idx = np.searchsorted(x, xnew, side='right') - 1
+    ynew = np.empty(xnew.shape[0])
+    for k in range(xnew.shape[0]):
+        i = min(max(idx[k], 0), last)
+        t = xnew[k] - x[i]
+        ynew[k] = ((c[0, i] * t + c[1, i]) * t + c[2, i]) * t + c[3, i]
+    return ynew
+
+
+def _evaluate_spline(spline: PPoly, xnew) -> np.ndarray:
+    """
+    Evaluate a cubic spline from _build_spline at the given frequencies.
+    Uses the compiled _eval_cubic kernel when numba is available.
+    """
+    xnew = np.asarray(xnew, dtype=np.float64)
+    if NUMBA_AVAILABLE and spline.c.shape[0] == 4:
+        return _eval_cubic(spline.x, spline.c, xnew)
+    return spline(xnew)
+
+
+def _to_points(freqs, values, rounded: bool) -> List[Tuple[int, float]]:
+    """
+    Pair frequencies and values as (int, float) tuples, optionally rounding every
+    value to 3 decimal places in a single array operation.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if rounded:
+        values = np.round(values, 3)
+    return list(zip(np.asarray(freqs, dtype=np.int64).tolist(), values.tolist()))
+
+
+def _to_output(freqs, values, rounded: bool, as_scan: bool) -> Union[Scan, List[Tuple[int, float]]]:
     """
-    return next(vswr for freq, vswr in vswr_data if freq == frequency)
+    Return freqs and values as a Scan (int64 frequencies, float64 values) when as_scan
+    is set, otherwise as (int, float) tuples, optionally rounded to 3 decimal places.
+    """
+    if not as_scan:
+        return _to_points(freqs, values, rounded)
+    values = np.asarray(values, dtype=np.float64)
+    if rounded:
+        values = np.round(values, 3)
+    return Scan(np.asarray(freqs, dtype=np.int64), values)
+
 
+def _scan_columns(scan: Scan) -> Tuple[np.ndarray, np.ndarray]:
+    """Frequencies of a Scan as int64 and its values as float64."""
+    return np.asarray(scan.freqs, dtype=np.int64), np.asarray(scan.vals, dtype=np.float64)
 
-def interpolated(vswr_data: List[Tuple[int, float]],
+
+def interpolated(vswr_data: Union[Scan, List[Tuple[int, float]]],
                  interpolation_factor: int = 3,
-                 method: str = 'cubic') -> List[Tuple[int, float]]:
+                 method: str = 'cubic',
+                 assume_sorted: bool = False,
+                 rounded: bool = True) -> Union[Scan, List[Tuple[int, float]]]:
     """
     Interpolates VSWR data to add points between existing measurements while preserving original values.
 
     Args:
-        vswr_data: List of tuples containing (frequency_khz, vswr_value)
+        vswr_data: Scan or list of tuples containing (frequency_khz, vswr_value)
         interpolation_factor: Number of points to add between each original point
         method: Interpolation method ('cubic' or 'none')
+        assume_sorted: Skip sorting when vswr_data is already in ascending frequency order,
+            as scanner output is
+        rounded: Round VSWR values to 3 decimal places; pass False when the output
+            feeds further processing
 
     Returns:
-        List of tuples containing (frequency_khz (int), vswr_value (float))
+        Scan (for a Scan input) or list of tuples containing (frequency_khz (int), vswr_value (float))
         with interpolated points added, sorted by frequency
     """
+    as_scan = isinstance(vswr_data, Scan)
+
     # Return original data if no interpolation requested
     if method.lower() == 'none' or interpolation_factor < 1:
-        return [(int(f), round(float(v), 3)) for f, v in vswr_data]
-
-    # Sort data by frequency and validate
-    try:
-        sorted_data = sorted((int(f), float(v)) for f, v in vswr_data)
-    except (ValueError, TypeError) as e:
-        raise ValueError(f"Invalid data point in input: {str(e)}")
-
-    if len(sorted_data) < 4:
+        if as_scan:
+            return _to_output(*_scan_columns(vswr_data), rounded, as_scan)
+        return _to_points([int(f) for f, _ in vswr_data], [float(v) for _, v in vswr_data], rounded)
+
+    # Validate and extract frequencies and values
+    if as_scan:
+        orig, orig_vals = _scan_columns(vswr_data)
+    else:
+        try:
+            typed_data = [(int(f), float(v)) for f, v in vswr_data]
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid data point in input: {str(e)}")
+        orig = np.array([f for f, _ in typed_data], dtype=np.int64)
+        orig_vals = np.array([v for _, v in typed_data], dtype=np.float64)
+
+    # Sort data by frequency (then value, as for tuples)
+    if assume_sorted:
+        if not np.all(np.diff(orig) > 0):
+            raise ValueError("vswr_data is not sorted by frequency")
+    else:
+        order = np.lexsort((orig_vals, orig))
+        orig, orig_vals = orig[order], orig_vals[order]
+
+    if len(orig) < 4:
         raise ValueError("Need at least 4 points for cubic interpolation")
 
-    # Extract frequencies and values
-    orig_freqs = np.array([f for f, _ in sorted_data])
-    orig_values = np.array([v for _, v in sorted_data])
-
-    # Create interpolation points
-    result = []
-
-    # Add all original points to preserve exact values
-    for freq, value in sorted_data:
-        result.append((freq, round(value, 3)))
-
     # Create interpolation function
     try:
-        cs = CubicSpline(orig_freqs, orig_values)
+        cs = _build_spline(tuple(orig.tolist()), tuple(orig_vals.tolist()))
     except Exception as e:
         raise ValueError(f"Error creating cubic spline: {str(e)}")
 
-    # Add interpolated points between each pair of original points
-    for i in range(len(sorted_data) - 1):
-        freq1, _ = sorted_data[i]
-        freq2, _ = sorted_data[i + 1]
+    # Build the whole interpolation grid at once: row i holds freq1 + j * step for
+    # j = 1..interpolation_factor between original points i and i + 1. Points at or
+    # past freq2, and intervals whose step is below 1 kHz, are dropped.
+    steps = np.diff(orig) // (interpolation_factor + 1)
+    grid = orig[:-1, None] + steps[:, None] * np.arange(1, interpolation_factor + 1)
+    new_freqs = grid[(steps[:, None] >= 1) & (grid < orig[1:, None])]
 
-        # Calculate step size for interpolation
-        step = (freq2 - freq1) // (interpolation_factor + 1)
+    # Evaluate the spline once for all new points
+    new_values = _evaluate_spline(cs, new_freqs)
 
-        # Skip if step is too small
-        if step < 1:
-            continue
+    # Merge with the original points (kept exact) and sort by frequency
+    freqs = np.concatenate((orig, new_freqs))
+    values = np.concatenate((orig_vals, new_values))
+    order = np.argsort(freqs, kind='stable')
+    return _to_output(freqs[order], values[order], rounded, as_scan)
 
-        # Add interpolated points
-        for j in range(1, interpolation_factor + 1):
-            new_freq = freq1 + (j * step)
-            if new_freq >= freq2:
-                break
-
-            new_value = float(cs(new_freq))  # Convert from numpy float
-            result.append((new_freq, round(new_value, 3)))
-
-    # Sort by frequency and return
-    return sorted(result, key=lambda x: x[0])
-
-def add_vswr_criterion_points(vswr_data: List[Tuple[int, float]],
+def add_vswr_criterion_points(vswr_data: Union[Scan, List[Tuple[int, float]]],
                               vswr_start_khz: int,
                               vswr_mid_khz: int,
-                              vswr_stop_khz: int) -> List[Tuple[int, float]]:
+                              vswr_stop_khz: int,
+                              assume_sorted: bool = False,
+                              rounded: bool = True) -> Union[Scan, List[Tuple[int, float]]]:
     """
     Add VSWR criterion frequency points using cubic interpolation.
 
     Args:
-        vswr_data: List of tuples containing (frequency_khz, vswr_value)
+        vswr_data: Scan or list of tuples containing (frequency_khz, vswr_value)
         vswr_start_khz: Start frequency point to add
         vswr_mid_khz: Middle frequency point to add
         vswr_stop_khz: Stop frequency point to add
+        assume_sorted: Skip sorting when vswr_data is already in ascending frequency order
+        rounded: Round VSWR values to 3 decimal places; pass False when the output
+            feeds further processing
 
     Returns:
-        List of tuples containing (frequency_khz (int), vswr_value (float))
+        Scan (for a Scan input) or list of tuples containing (frequency_khz (int), vswr_value (float))
         with vswr values rounded to 3 decimal places, sorted by frequency
     """
-
-    # Convert input data to ensure correct types and rounding
-    def convert_point(point: Tuple[int, float]) -> Tuple[int, float]:
-        freq, val = point
-        return (int(freq), round(float(val), 3))
+    as_scan = isinstance(vswr_data, Scan)
 
     # Convert and validate input data
-    try:
-        typed_data = [convert_point(point) for point in vswr_data]
-    except (ValueError, TypeError) as e:
-        raise ValueError(f"Invalid data point in input: {str(e)}")
+    if as_scan:
+        freqs, values = _scan_columns(vswr_data)
+    else:
+        try:
+            typed_data = [(int(freq), float(val)) for freq, val in vswr_data]
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid data point in input: {str(e)}")
+        freqs = np.array([f for f, _ in typed_data], dtype=np.int64)
+        values = np.array([v for _, v in typed_data], dtype=np.float64)
 
     # Sort data by frequency
-    sorted_data = sorted(typed_data, key=lambda x: x[0])
-
-    # Extract frequencies and values
-    freqs = [f for f, _ in sorted_data]
-    values = [v for _, v in sorted_data]
+    if assume_sorted:
+        if not np.all(np.diff(freqs) > 0):
+            raise ValueError("vswr_data is not sorted by frequency")
+    else:
+        order = np.lexsort((values, freqs))
+        freqs, values = freqs[order], values[order]
 
     # Validate frequency range
-    freq_min, freq_max = min(freqs), max(freqs)
+    freq_min, freq_max = int(freqs.min()), int(freqs.max())
     criterion_freqs = [vswr_start_khz, vswr_mid_khz, vswr_stop_khz]
 
     for freq in criterion_freqs:
@@ -169,82 +325,94 @@ def add_vswr_criterion_points(vswr_data: List[Tuple[int, float]],
 
     # Create cubic interpolation function
     try:
-        interp_func = interp1d(freqs, values, kind='cubic')
+        interp_func = _build_spline(tuple(freqs.tolist()), tuple(values.tolist()))
     except ValueError as e:
         raise ValueError(f"Error creating interpolation function: {str(e)}")
 
-    # Create result set starting with original data
-    result = set(typed_data)  # Use set to avoid duplicates
-
-    # Add interpolated values at criterion frequencies
-    for freq in criterion_freqs:
-        if freq not in freqs:  # Only add if frequency doesn't already exist
-            value = float(interp_func(freq))  # Convert from numpy float to Python float
-            result.add((int(freq), round(value, 3)))
+    # Add interpolated values at criterion frequencies that don't already exist,
+    # evaluating the spline once for all of them
+    missing_freqs = np.setdiff1d(np.asarray(criterion_freqs, dtype=np.int64), freqs)
+    if missing_freqs.size:
+        missing_values = _evaluate_spline(interp_func, missing_freqs)
+        freqs = np.concatenate((freqs, missing_freqs))
+        values = np.concatenate((values, missing_values))
+        order = np.argsort(freqs, kind='stable')
+        freqs, values = freqs[order], values[order]
 
-    # Convert back to list and sort by frequency
-    return sorted(result, key=lambda x: x[0])
+    return _to_output(freqs, values, rounded, as_scan)
 
 
-def smoothed(vswr_results: List[Tuple[int, float]], vswr_start_khz: int, vswr_stop_khz: int,
-             vswr_mid_khz: int, interpolation_factor: int = 10, method: str = 'cubic') -> List[Tuple[int, float]]:
+def smoothed(vswr_results: Union[Scan, List[Tuple[int, float]]], vswr_start_khz: int, vswr_stop_khz: int,
+             vswr_mid_khz: int, interpolation_factor: int = 10, method: str = 'cubic',
+             rounded: bool = True) -> Union[Scan, List[Tuple[int, float]]]:
     """
     Smooths VSWR values using cubic interpolation while preserving original frequency points.
 
     Args:
-        vswr_results: List of tuples containing (frequency_khz, vswr_value)
+        vswr_results: Scan or list of tuples containing (frequency_khz, vswr_value)
         vswr_start_khz: Start frequency in kHz (not used in smoothing)
         vswr_stop_khz: Stop frequency in kHz (not used in smoothing)
         vswr_mid_khz: Middle frequency in kHz (not used in smoothing)
         interpolation_factor: Not used in this version
         method: Smoothing method ('cubic' or 'none')
+        rounded: Round VSWR values to 3 decimal places
 
     Returns:
-        List of tuples containing (frequency_khz, smoothed_vswr_value)
+        Scan (for a Scan input) or list of tuples containing (frequency_khz, smoothed_vswr_value)
         Frequency is int, vswr_value is float rounded to 3 decimal places
     """
+    as_scan = isinstance(vswr_results, Scan)
 
     def convert_types(freq, val):
-        """Convert types and round VSWR to 3 decimal places"""
+        """Convert types, reporting the offending point on failure"""
         try:
-            return (int(freq), round(float(val), 3))
+            return (int(freq), float(val))
         except (ValueError, TypeError) as e:
             raise ValueError(f"Invalid data point ({freq}, {val}): {str(e)}")
 
+    # Ensure input data uses correct types
+    if as_scan:
+        freqs, values = _scan_columns(vswr_results)
+    else:
+        try:
+            typed_data = [convert_types(f, v) for f, v in vswr_results]
+        except ValueError as e:
+            if method.lower() == 'none':
+                raise
+            raise ValueError(f"Error converting input data: {str(e)}")
+        freqs = np.array([f for f, _ in typed_data], dtype=np.int64)
+        values = np.array([v for _, v in typed_data], dtype=np.float64)
+
     # Return original data converted to correct types if no smoothing requested
     if method.lower() == 'none':
-        return [convert_types(f, v) for f, v in vswr_results]
-
-    # Ensure input data uses correct types
-    try:
-        typed_data = [convert_types(f, v) for f, v in vswr_results]
-    except ValueError as e:
-        raise ValueError(f"Error converting input data: {str(e)}")
+        return _to_output(freqs, values, rounded, as_scan)
 
     # Filter out non-finite values
-    filtered_data = [(freq, val) for freq, val in typed_data if np.isfinite(val)]
-
-    if not filtered_data:
+    finite = np.isfinite(values)
+    if not finite.any():
         raise ValueError("No finite values found in the input data")
+    if not finite.all():
+        freqs, values = freqs[finite], values[finite]
 
     # Sort data by frequency
-    sorted_data = sorted(filtered_data, key=lambda x: x[0])
-
-    # Extract frequencies and values
-    freqs = np.array([f for f, _ in sorted_data])
-    values = np.array([v for _, v in sorted_data])
+    order = np.argsort(freqs, kind='stable')
+    freqs, values = freqs[order], values[order]
 
     # Create cubic interpolation function
     try:
-        interp_func = interp1d(freqs, values, kind='cubic', fill_value='extrapolate')
+        interp_func = _build_spline(tuple(freqs.tolist()), tuple(values.tolist()))
     except ValueError as e:
         raise ValueError(f"Error creating interpolation function: {str(e)}")
 
     # Apply smoothing to original frequency points
-    smoothed_values = interp_func(freqs)
+    smoothed_values = _evaluate_spline(interp_func, freqs)
+
+    # Convert back to regular Python types, rounding once over the whole array
+    return _to_output(freqs, smoothed_values, rounded, as_scan)
 
-    # Convert back to regular Python types with proper rounding
-    return [convert_types(int(f), float(v)) for f, v in zip(freqs, smoothed_values)]
+
+# 10 ** (-x / 20) == exp(x * _NEG_LN10_OVER_20)
+_NEG_LN10_OVER_20 = -math.log(10.0) / 20.0
 
 
 def calculate_vswr(return_loss_db: float) -> float:
@@ -258,11 +426,11 @@ def calculate_vswr(return_loss_db: float) -> float:
         VSWR value (between 1.1 and 5.0)
     """
     # Handle invalid input cases
-    if not isinstance(return_loss_db, (int, float)) or np.isnan(return_loss_db):
+    if not isinstance(return_loss_db, (int, float)) or math.isnan(return_loss_db):
         return 5.0
 
-    # Convert return loss to linear scale
-    reflection_coefficient = 10 ** (-abs(return_loss_db) / 20)
+    # Convert return loss to linear scale (exp avoids the generic ** dispatch)
+    reflection_coefficient = math.exp(_NEG_LN10_OVER_20 * abs(return_loss_db))
 
     # Calculate VSWR
     if reflection_coefficient >= 1:
@@ -271,178 +439,138 @@ def calculate_vswr(return_loss_db: float) -> float:
     vswr = (1 + reflection_coefficient) / (1 - reflection_coefficient)
 
     # Limit the range
-    if vswr < 1.1:
-        return 1.1
-    elif vswr > 5.0:
-        return 5.0
+    return float(min(max(vswr, 1.1), 5.0))
 
-    return float(vswr)
 
+# fastmath without the nnan/ninf flags so the NaN check below survives
+@njit(cache=True, fastmath={'nsz', 'arcp', 'contract', 'afn', 'reassoc'}, boundscheck=False)
+def _vswr_kernel(return_loss_db: np.ndarray, out: np.ndarray) -> None:
+    """Single fused pass of calculate_vswr over a 1D float32 or float64 array"""
+    for i in range(return_loss_db.shape[0]):
+        return_loss = return_loss_db[i]
+        if return_loss != return_loss:
+            out[i] = 5.0
+            continue
+        r = math.exp(_NEG_LN10_OVER_20 * abs(return_loss))
+        if r >= 1.0:
+            out[i] = 5.0
+            continue
+        vswr = (1.0 + r) / (1.0 - r)
+        out[i] = min(max(vswr, 1.1), 5.0)
 
-def process_vswr_data(results: List[Tuple[int, float]]) -> List[Tuple[int, float]]:
+
+def calculate_vswr_array(return_loss_db: np.ndarray) -> np.ndarray:
     """
-    Convert frequency and return loss measurements to frequency and VSWR.
+    Vectorized calculate_vswr: convert an array of return losses in dB to VSWR,
+    with results limited to range 1.1 to 5.0.
 
     Args:
-        results: List of tuples containing (frequency_khz, return_loss_db)
+        return_loss_db: Array of return losses in dB
 
     Returns:
-        List of tuples containing (frequency_khz, vswr)
+        Array of VSWR values (between 1.1 and 5.0); NaN inputs map to 5.0.
+        float32 input stays float32, anything else is computed in float64.
     """
-    return [(freq, calculate_vswr(return_loss)) for freq, return_loss in results]
+    dtype = np.float32 if np.asarray(return_loss_db).dtype == np.float32 else np.float64
+    return_loss_db = np.ascontiguousarray(return_loss_db, dtype=dtype)
+    if NUMBA_AVAILABLE:
+        vswr = np.empty_like(return_loss_db)
+        _vswr_kernel(return_loss_db.ravel(), vswr.ravel())
+        return vswr
+
+    # Convert return loss to linear scale; typed constants keep float32 from upcasting
+    one = dtype(1.0)
+    reflection_coefficient = np.exp(np.abs(return_loss_db) * dtype(_NEG_LN10_OVER_20))
+
+    # Calculate VSWR; a reflection coefficient of 1 divides by zero and is clipped below
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vswr = (one + reflection_coefficient) / (one - reflection_coefficient)
+    vswr[reflection_coefficient >= 1.0] = 5.0
+
+    # Limit the range
+    np.clip(vswr, 1.1, 5.0, out=vswr)
+    vswr[np.isnan(return_loss_db)] = 5.0
+    return vswr
 
 
-def subtract_baseline(results: List[Tuple[int, float]],
-                      baseline: List[Tuple[int, float]]) -> List[Tuple[int, float]]:
+def process_vswr_data(results: Union[Scan, List[Tuple[int, float]]]) -> Union[Scan, List[Tuple[int, float]]]:
     """
-    Subtract baseline values from results.
+    Convert frequency and return loss measurements to frequency and VSWR.
 
     Args:
-        results: List of tuples containing (frequency_khz, value)
-        baseline: List of tuples containing (frequency_khz, value)
+        results: Scan or list of tuples containing (frequency_khz, return_loss_db)
 
     Returns:
-        List of tuples containing (frequency_khz, value_minus_baseline)
+        Scan (for a Scan input) or list of tuples containing (frequency_khz, vswr)
     """
-    # Create a dictionary of baseline values keyed by frequency
-    baseline_dict = {freq: value for freq, value in baseline}
+    if isinstance(results, Scan):
+        return Scan(results.freqs, calculate_vswr_array(results.vals))
 
-    # Subtract baseline values from results
-    subtracted_results = []
-    for freq, value in results:
-        if freq in baseline_dict:
-            subtracted_value = value - baseline_dict[freq]
-            subtracted_results.append((freq, subtracted_value))
-        else:
-            # Handle case where frequency doesn't exist in baseline
-            subtracted_results.append((freq, value))
+    freqs, return_loss = from_tuples(results)
+    return to_tuples(freqs, calculate_vswr_array(return_loss))
 
-    return subtracted_results
 
+def subtract_baseline(results: Union[Scan, List[Tuple[int, float]]],
+                      baseline: Union[Scan, List[Tuple[int, float]]]) -> Union[Scan, List[Tuple[int, float]]]:
+    """
+    Subtract baseline values from results.
 
-class FrequencyScanner:
-    # Constants that could be parameterized in future if needed
-    RF_POWER_DBM = 0
-    AUTO_RF = True
-    MAX_POINTS_PER_PACKET = 40
-    AVERAGES_PER_POINT = 8
-    CAPTURE_DURATION = 0.1
-    NUM_CAPTURES = 60
+    Args:
+        results: Scan or list of tuples containing (frequency_khz, value)
+        baseline: Scan or list of tuples containing (frequency_khz, value)
 
-    def __init__(self, com_port: str, verbose: bool = False):
-        """Initialize the frequency scanner."""
-        self.com_port = com_port
-        self.verbose = verbose
-        self.tpi: Optional[TPIController] = None
-        self.all_raw_data = bytearray()
+    Returns:
+        Scan (for a Scan input) or list of tuples containing (frequency_khz, value_minus_baseline)
+    """
+    result_scan = results if isinstance(results, Scan) else from_tuples(results)
+    baseline_scan = baseline if isinstance(baseline, Scan) else from_tuples(baseline)
+    freqs = np.asarray(result_scan.freqs)
 
+    # Same frequency grid (the usual case): plain array subtraction
+    if np.array_equal(freqs, baseline_scan.freqs):
+        baseline_vals = baseline_scan.vals
+    else:
+        baseline_vals = _baseline_on_grid(freqs, baseline_scan)
 
+    if isinstance(results, Scan):
+        return Scan(results.freqs, subtract_baseline_arr(results.vals, baseline_vals))
+    return to_tuples(freqs, np.subtract(result_scan.vals, baseline_vals))
 
-    def setup(self, start_khz: int, stop_khz: int, step_khz: int, dwell_ms: int) -> None:
-        """
-        Set up the analyzer with the specified parameters.
-        """
-        if self.verbose:
-            print("Initializing controller...")
-        self.tpi = TPIController(self.com_port)
 
-        try:
-            if self.verbose:
-                print("Enabling user mode...")
-            self.tpi.enable_user_control()
-
-            if self.verbose:
-                print(f"Setting RF power to {self.RF_POWER_DBM} dBm...")
-            self.tpi.set_rf_power(self.RF_POWER_DBM)
-
-            if self.verbose:
-                print("Setting analyzer parameters...")
-            num_points_calc = calculate_num_points(start_khz, stop_khz, step_khz)
-
-            self.tpi.set_analyzer_parameters_v2(
-                start_khz=start_khz,
-                stop_khz=stop_khz,
-                step_khz=step_khz,
-                dwell_ms=dwell_ms,
-                num_points=num_points_calc,
-                auto_rf=self.AUTO_RF,
-                max_points_per_packet=self.MAX_POINTS_PER_PACKET,
-                averages_per_point=self.AVERAGES_PER_POINT
-            )
-
-            # Turn detector and RF ON
-            self.tpi.set_detector_state(True)
-            self.tpi.set_rf_output_state(True)
+def _baseline_on_grid(freqs: np.ndarray, baseline: Scan) -> np.ndarray:
+    """
+    Baseline value at each of freqs, matched on exact frequency (the last duplicate wins,
+    as in a dict). Frequencies missing from the baseline get 0 so their value is kept.
+    """
+    baseline_freqs = np.asarray(baseline.freqs)
+    baseline_vals = np.asarray(baseline.vals, dtype=np.float64)
+    if baseline_freqs.size == 0:
+        return np.zeros(len(freqs))
 
-        except Exception as e:
-            self.shutdown()
-            raise e
+    order = np.argsort(baseline_freqs, kind='stable')
+    sorted_freqs = baseline_freqs[order]
+    idx = np.searchsorted(sorted_freqs, freqs, side='right') - 1
+    np.clip(idx, 0, None, out=idx)
+    found = sorted_freqs[idx] == freqs
+    return np.where(found, baseline_vals[order][idx], 0.0)
 
-    def run(self, start_khz: int, step_khz: int) -> List[Tuple[int, float]]:
-        """
-        Run the frequency scan and return the results.
-        """
-        if not self.tpi:
-            raise RuntimeError("Scanner not set up. Call setup() first.")
 
-        results = []
-        self.all_raw_data = bytearray()
+def subtract_baseline_arr(results_vals: np.ndarray, baseline_vals: np.ndarray) -> np.ndarray:
+    """
+    Subtract baseline values from results measured on the same frequency grid.
 
-        try:
-            if self.verbose:
-                print("Starting analyzer...")
-            self.tpi.start_analyzer_v2()
-
-            if self.verbose:
-                print("Receiving analyzer data...")
-
-            # Capture data
-            for i in range(self.NUM_CAPTURES):
-                raw_data = self.tpi.capture_analyzer_raw(duration=self.CAPTURE_DURATION)
-
-                if len(raw_data) > 12:
-                    processed_data = raw_data[11:-1]
-                    self.all_raw_data.extend(processed_data)
-
-                if len(raw_data) >= 7 and raw_data[-7:].hex() == "aa550002073fb7":
-                    if len(self.all_raw_data) >= 7:
-                        self.all_raw_data = self.all_raw_data[:-7]
-                    break
-
-            # Convert accumulated data to float values
-            float_values = []
-            for i in range(0, len(self.all_raw_data), 4):
-                if i + 4 <= len(self.all_raw_data):
-                    float_val = struct.unpack('<f', self.all_raw_data[i:i + 4])[0]
-                    float_values.append(float_val)
-
-            # Create results list with frequency and power values
-            for i, value in enumerate(float_values):
-                freq = start_khz + (i * step_khz)
-                results.append((freq, value))
-                if self.verbose:
-                    print(f"{freq:10d} kHz    {value:8.2f} dBm")
-
-            return results
+    Args:
+        results_vals: Array of measured values
+        baseline_vals: Array of baseline values at the same frequencies
 
-        except Exception as e:
-            self.shutdown()
-            raise e
+    Returns:
+        Array of values minus baseline, in the common type of the inputs
+        (float32 for two analyzer sweeps, float64 if either input is float64)
+    """
+    return np.subtract(results_vals, baseline_vals, dtype=np.result_type(results_vals, baseline_vals))
 
-    def shutdown(self) -> None:
-        """
-        Clean up and close the connection.
-        """
-        if self.tpi:
-            try:
-                self.tpi.set_rf_output_state(False)
-                self.tpi.set_detector_state(False)
-            finally:
-                self.tpi.close()
-                self.tpi = None
 
-def get_highest_baseline(scanner: FrequencyScanner, start_khz: int, step_khz: int, num_captures: int = 10) -> List[
-    Tuple[int, float]]:
+def get_highest_baseline(scanner: FrequencyScanner, start_khz: int, step_khz: int, num_captures: int = 10) -> Scan:
     """
     Capture multiple baseline measurements and return the one with highest values.
 
@@ -453,66 +581,66 @@ def get_highest_baseline(scanner: FrequencyScanner, start_khz: int, step_khz: in
         num_captures: Number of baseline captures to perform
 
     Returns:
-        List of tuples containing (frequency_khz, value) for the highest baseline
+        Scan (frequency_khz as int64, value as float32) of the highest baseline;
+        ValueError if no capture had a usable (non-NaN) average
     """
-    baselines = []
-    baseline_averages = []
+    best_avg = float('-inf')
+    best_baseline = None
+    highest_idx = 0
     print(f"Capturing {num_captures} baselines...")
     for i in range(num_captures):
-        baseline = scanner.run(start_khz, step_khz)
-        # Calculate average value for this baseline immediately
-        values = [value for _, value in baseline]
-        avg_value = sum(values) / len(values)
+        frequencies, values = scanner.run(start_khz, step_khz)
+        # Calculate average value for this baseline immediately (in float64, as
+        # find_lowest_reflected_results does, so near-ties rank the same way)
+        avg_value = float(values.mean(dtype=np.float64))
         print(f"Capturing baseline {i + 1}/{num_captures}, average value: {avg_value:.2f} dBm")
-        baselines.append(baseline)
-        baseline_averages.append(avg_value)
-    # Find the baseline with highest average value
-    highest_idx = baseline_averages.index(max(baseline_averages))
-    highest_baseline = baselines[highest_idx]
-
-    print(f"Selected baseline {highest_idx + 1} with average value: {baseline_averages[highest_idx]:.2f} dBm")
+        # Keep only the baseline with the highest average so far
+        if avg_value > best_avg:
+            best_avg = avg_value
+            best_baseline = (frequencies, values)
+            highest_idx = i
+    if best_baseline is None:
+        raise ValueError(f"No usable baseline in {num_captures} captures "
+                         f"(none taken, or every average was NaN)")
+    highest_baseline = Scan(*best_baseline)
+
+    print(f"Selected baseline {highest_idx + 1} with average value: {best_avg:.2f} dBm")
     return highest_baseline
 
 
-def find_lowest_reflected_results(current_results: List[Tuple[int, float]],
-                                  previous_lowest_results: Optional[List[Tuple[int, float]]] = None) -> Tuple[
-    List[Tuple[int, float]], float]:
+def find_lowest_reflected_results(current_freqs: np.ndarray, current_vals: np.ndarray,
+                                  previous_lowest: Optional[Tuple[np.ndarray, np.ndarray, float]] = None
+                                  ) -> Tuple[np.ndarray, np.ndarray, float]:
     """
     Determine if the current results have lower values than the previous lowest results.
     Args:
-        current_results: Current scan results as list of (frequency, value) tuples
-        previous_lowest_results: Previous lowest results as list of (frequency, value) tuples, or None
+        current_freqs: Frequencies of the current scan in kHz
+        current_vals: Values of the current scan
+        previous_lowest: Previous lowest results as a (frequencies, values, average) triple, or None
     Returns:
-        Tuple containing:
-            - List of (frequency, value) tuples representing the lowest results
-            - Average value of the lowest results
+        (frequencies, values, average) triple of the lowest results
     """
-    current_average = sum(value for _, value in current_results) / len(current_results)
+    current_average = float(current_vals.mean(dtype=np.float64))
 
-    if previous_lowest_results is None:
-        return current_results, current_average
+    if previous_lowest is None:
+        return current_freqs, current_vals, current_average
 
-    lowest_average = sum(value for _, value in previous_lowest_results) / len(previous_lowest_results)
+    lowest_average = previous_lowest[2]
 
     if current_average < lowest_average:
         print(f"New lowest results found with average value: {current_average:.2f} dBm")
-        return current_results, current_average
+        return current_freqs, current_vals, current_average
 
     print(f"Current results have higher average value than previous lowest results: {current_average:.2f} dBm > {lowest_average:.2f} dBm")
-    return previous_lowest_results, lowest_average
+    return previous_lowest
 
 
 def scan_frequency_range(com_port: str, start_khz: int, stop_khz: int,
-                         step_khz: int, dwell_ms: int, verbose: bool = False) -> List[Tuple[int, float]]:
+                         step_khz: int, dwell_ms: int, verbose: bool = False) -> Scan:
     """
     Backward compatibility wrapper for the original function.
     """
-    scanner = FrequencyScanner(com_port, verbose)
-    try:
-        scanner.setup(start_khz, stop_khz, step_khz, dwell_ms)
-        return scanner.run(start_khz, step_khz)
-    finally:
-        scanner.shutdown()
+    return scan(com_port, start_khz, stop_khz, step_khz, dwell_ms, verbose)
 
 
 def visualize_results(frequencies, power_levels):
@@ -541,7 +669,61 @@ def visualize_results(frequencies, power_levels):
         print(f"Error during visualization: {str(e)}")
 
 
-def evaluate_vswr_range(vswr_data: List[Tuple[int, float]],
+class LivePlot:
+    """
+    Single matplotlib figure that is updated in place between scans instead of
+    building a new figure for every result set.
+    """
+
+    def __init__(self, title: str = 'Frequency Scan Results', ylabel: str = 'Power (dBm)'):
+        self.fig = None
+        self.ax = None
+        self.line = None
+        try:
+            import matplotlib.pyplot as plt
+
+            self._plt = plt
+            plt.ion()
+            self.fig, self.ax = plt.subplots(figsize=(10, 6))
+            self.line, = self.ax.plot([], [], 'b-', marker='o')
+            self.ax.grid(True)
+            self.ax.set_xlabel('Frequency (kHz)')
+            self.ax.set_ylabel(ylabel)
+            self.ax.set_title(title)
+            self.ax.ticklabel_format(style='plain')
+            self.fig.tight_layout()
+            plt.show(block=False)
+        except ImportError:
+            print("Matplotlib is not installed. Skipping visualization.")
+        except Exception as e:
+            print(f"Error during visualization: {str(e)}")
+            self.line = None
+
+    def update(self, frequencies, power_levels) -> None:
+        """
+        Replace the plotted data with a new scan.
+
+        Args:
+            frequencies: Frequency values in kHz
+            power_levels: Measurements to plot against frequency
+        """
+        if self.line is None:
+            return
+        self.line.set_data(frequencies, power_levels)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.fig.canvas.draw_idle()
+        self.fig.canvas.flush_events()
+
+    def hold(self) -> None:
+        """Leave interactive mode and block on the final plot until it is closed"""
+        if self.line is None:
+            return
+        self._plt.ioff()
+        self._plt.show()
+
+
+def evaluate_vswr_range(vswr_data: Union[Scan, List[Tuple[int, float]]],
                         freq_low: int,
                         freq_high: int,
                         vswr_limit: float) -> bool:
@@ -550,7 +732,7 @@ def evaluate_vswr_range(vswr_data: List[Tuple[int, float]],
     Uses linear interpolation between measurement points for accurate assessment.
 
     Args:
-        vswr_data: List of tuples containing (frequency_khz, vswr_value)
+        vswr_data: Scan or list of tuples containing (frequency_khz, vswr_value)
         freq_low: Lower frequency bound in kHz
         freq_high: Upper frequency bound in kHz
         vswr_limit: Maximum acceptable VSWR value
@@ -558,56 +740,58 @@ def evaluate_vswr_range(vswr_data: List[Tuple[int, float]],
     Returns:
         bool: True if all VSWR values (including interpolated) are below limit, False otherwise
     """
-    # Sort data by frequency to ensure proper interpolation
-    sorted_data = sorted(vswr_data, key=lambda x: x[0])
+    if not isinstance(vswr_data, Scan):
+        vswr_data = from_tuples(vswr_data)
+    freqs = np.asarray(vswr_data.freqs, dtype=np.int64)
+    vswr = np.asarray(vswr_data.vals)
+    if vswr.dtype != np.float32:
+        vswr = vswr.astype(np.float64)
+
+    # Sort data by frequency to ensure proper interpolation (sweeps normally arrive sorted)
+    if np.any(freqs[1:] < freqs[:-1]):
+        order = np.argsort(freqs, kind='stable')
+        freqs = freqs[order]
+        vswr = vswr[order]
 
     # Validate frequency range
-    min_freq = sorted_data[0][0]
-    max_freq = sorted_data[-1][0]
+    min_freq = int(freqs[0])
+    max_freq = int(freqs[-1])
     if freq_low < min_freq or freq_high > max_freq:
         raise ValueError(f"Requested frequency range ({freq_low}-{freq_high} kHz) is outside "
                          f"measured range ({min_freq}-{max_freq} kHz)")
 
-    # Find relevant measurement points within and adjacent to our frequency range
-    relevant_points = []
-    for i, (freq, vswr) in enumerate(sorted_data):
-        if freq >= freq_low or (i > 0 and sorted_data[i - 1][0] < freq_low):
-            relevant_points.append((freq, vswr))
-        if freq > freq_high:
-            break
-
-    # Check each segment
-    for i in range(len(relevant_points) - 1):
-        freq1, vswr1 = relevant_points[i]
-        freq2, vswr2 = relevant_points[i + 1]
-
-        # Skip if segment is entirely outside our range of interest
-        if freq1 > freq_high or freq2 < freq_low:
-            continue
-
-        # If either point exceeds limit, check if the interpolated values between them also exceed
-        if vswr1 > vswr_limit or vswr2 > vswr_limit:
-            # Calculate slope for interpolation
-            slope = (vswr2 - vswr1) / (freq2 - freq1)
-
-            # Determine check points: segment endpoints within our range
-            check_start = max(freq1, freq_low)
-            check_end = min(freq2, freq_high)
-
-            # Check interpolated values at endpoints of the relevant segment
-            vswr_start = vswr1 + slope * (check_start - freq1)
-            vswr_end = vswr1 + slope * (check_end - freq1)
-
-            if max(vswr_start, vswr_end) > vswr_limit:
-                print(f"VSWR limit exceeded between {check_start} kHz ({vswr_start:.2f}) "
-                      f"and {check_end} kHz ({vswr_end:.2f})")
-                return False
-
-            # If slope is not zero, check the peak/valley point if it falls within our segment
-            if abs(slope) > 0:
-                # No need to check intermediate points as linear interpolation means
-                # the maximum/minimum will be at the endpoints we already checked
-                pass
+    # Fast pass: if no sample in the range, nor the neighbours the range edges are
+    # interpolated from, exceeds the limit, no interpolated value can either
+    i_low = max(int(np.searchsorted(freqs, freq_low, side='right')) - 1, 0)
+    i_high = min(int(np.searchsorted(freqs, freq_high, side='left')), freqs.size - 1)
+    window = vswr[i_low:i_high + 1]
+    if window.size and window.max() <= vswr_limit:
+        return True
+
+    # Only the segments that overlap the range matter: from the last point below
+    # freq_low through the first point above freq_high
+    seg_low = max(int(np.searchsorted(freqs, freq_low, side='left')) - 1, 0)
+    seg_high = int(np.searchsorted(freqs, freq_high, side='right')) + 1
+    freqs = freqs[seg_low:seg_high]
+    vswr = vswr[seg_low:seg_high]
+
+    # Every segment between neighbouring points, clipped to the range of interest.
+    # VSWR is linear along a segment, so its maximum is at one of the clipped endpoints.
+    freq1, freq2 = freqs[:-1], freqs[1:]
+    vswr1, vswr2 = vswr[:-1], vswr[1:]
+    check_start = np.maximum(freq1, freq_low)
+    check_end = np.minimum(freq2, freq_high)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (vswr2 - vswr1) / (freq2 - freq1)
+    vswr_start = vswr1 + slope * (check_start - freq1)
+    vswr_end = vswr1 + slope * (check_end - freq1)
+
+    exceeded = np.maximum(vswr_start, vswr_end) > vswr_limit
+    if exceeded.any():
+        i = int(np.argmax(exceeded))
+        print(f"VSWR limit exceeded between {int(check_start[i])} kHz ({vswr_start[i]:.2f}) "
+              f"and {int(check_end[i])} kHz ({vswr_end[i]:.2f})")
+        return False
 
     return True
 
@@ -629,37 +813,29 @@ def main():
     scanner.setup(start_khz, stop_khz, step_khz, dwell_ms)
 
     input('Disconnect Antenna and hit enter to continue:')
-    baseline = get_highest_baseline(scanner, start_khz, step_khz,10)
+    # The baseline is fixed for the whole run and already arrays (float32, as measured)
+    baseline_scan = get_highest_baseline(scanner, start_khz, step_khz,10)
     input('Connect Antenna and hit enter to continue:')
 
     try:
 
-        lowest_reflected_results = None
-        lowest_average = float('inf')
-
-        for i in range(10):
-            # Perform the scan
-            results_reflected =  scanner.run(start_khz, step_khz)
+        lowest_reflected = None
+        live_plot = LivePlot()
 
+        # Perform the scans with the analyzer kept armed between sweeps
+        for reflected in scanner.run_many(start_khz, step_khz, 10):
             # Find lowest results
-            lowest_reflected_results, lowest_average = find_lowest_reflected_results(
-                results_reflected,
-                lowest_reflected_results
-            )
+            lowest_reflected = find_lowest_reflected_results(reflected.freqs, reflected.vals, lowest_reflected)
 
-            results_corrected = subtract_baseline(results_reflected, baseline)
+            results_corrected = subtract_baseline(reflected, baseline_scan)
 
             results_vswr = process_vswr_data(results_corrected)
 
-
             # Separate frequencies and power levels
-            frequencies = [r[0] for r in results_vswr]
-            vswr = [r[1] for r in results_vswr]
-
-            vswr_data = list(zip(frequencies, vswr))
+            frequencies, vswr = results_vswr
 
             # Check if VSWR is below 1.5 between 1616000 kHz and 1626500 kHz
-            passed = evaluate_vswr_range(vswr_data, 1616000, 1626500, 1.5)
+            passed = evaluate_vswr_range(results_vswr, 1616000, 1626500, 1.5)
             if passed:
                 print("VSWR test passed - all values within limits")
             else:
@@ -667,13 +843,17 @@ def main():
 
             # Print summary
             print("\nScan Summary:")
-            print(f"Points measured: {len(results_vswr)}")
-            print(f"Frequency range: {min(frequencies):,} kHz to {max(frequencies):,} kHz")
-            print(f"Power range: {min(vswr):.2f} dBm to {max(vswr):.2f} dBm")
+            # Sweep frequencies ascend, so the range is just the end points
+            fmin, fmax = int(frequencies[0]), int(frequencies[-1])
+            pmin, pmax = float(vswr.min()), float(vswr.max())
+            print(f"Points measured: {frequencies.size}")
+            print(f"Frequency range: {fmin:,} kHz to {fmax:,} kHz")
+            print(f"Power range: {pmin:.2f} dBm to {pmax:.2f} dBm")
 
-            # Create visualization in a separate function
-            visualize_results(frequencies, vswr)
+            # Redraw the existing figure rather than creating a new one per scan
+            live_plot.update(frequencies, vswr)
 
+        live_plot.hold()
 
     except Exception as e:
         print(f"Error during scan: {str(e)}")
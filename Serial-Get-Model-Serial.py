@@ -1,39 +1,64 @@
 import serial
 import sys
 
+def checksum(length, body):
+    # 0xFF minus the low byte of the sum of both length bytes and the body
+    return ~((length >> 8) + (length & 0xFF) + sum(body)) & 0xFF
+
 def build_packet(body_bytes):
-    # Convert body_bytes to bytearray if it's a list
-    body_bytes = bytearray(body_bytes)
-    # Header: 0xAA, 0x55, length (2 bytes)
+    # Whole packet in one preallocated buffer: header, body, checksum
     body_len = len(body_bytes)
-    header = bytearray([
-        0xAA,
-        0x55,
-        (body_len >> 8) & 0xFF,
-        body_len & 0xFF
-    ])
+    pkt = bytearray(body_len + 5)
+    # Header: 0xAA, 0x55, length (2 bytes)
+    pkt[0] = 0xAA
+    pkt[1] = 0x55
+    pkt[2] = (body_len >> 8) & 0xFF
+    pkt[3] = body_len & 0xFF
+    # Body may be a list of ints or any bytes-like object
+    pkt[4:4 + body_len] = body_bytes
     # Checksum: 0xFF - sum of length bytes + body bytes
-    checksum_base = header[2] + header[3] + sum(body_bytes)
-    checksum = (0xFF - (checksum_base & 0xFF)) & 0xFF
-    return header + body_bytes + bytes([checksum])
+    pkt[-1] = checksum(body_len, pkt[4:4 + body_len])
+    return bytes(pkt)
+
+# Fixed command packets, built once at import
+PKT_ENABLE = build_packet(b'\x08\x01')  # Enable user control
+PKT_MODEL = build_packet(b'\x07\x02')   # Read model number
+PKT_SERIAL = build_packet(b'\x07\x03')  # Read serial number
+
+# Trailing bytes stripped from text replies: ASCII whitespace and NUL padding
+TEXT_PADDING = b' \t\r\n\x0b\x0c\x00'
+
+# Bytes received but not yet consumed; kept across calls so nothing read ahead is lost
+_rx_buf = bytearray()
+
+def _fill(ser, n):
+    # Top up the receive buffer to at least n bytes, taking whatever is already waiting
+    while len(_rx_buf) < n:
+        chunk = ser.read(max(ser.in_waiting, n - len(_rx_buf)))
+        if not chunk:
+            raise TimeoutError("Timeout waiting for response.")
+        _rx_buf.extend(chunk)
 
 def read_response(ser, expected_len):
-    # Read until header found
+    # Read until header found, scanning blocks of bytes instead of one byte at a time
     while True:
-        b1 = ser.read(1)
-        if b1 == b'\xAA':
-            b2 = ser.read(1)
-            if b2 == b'\x55':
-                break
+        i = _rx_buf.find(b'\xAA\x55')
+        if i >= 0:
+            break
+        # Drop the scanned bytes, keeping a trailing 0xAA that may start the header
+        del _rx_buf[:len(_rx_buf) - 1 if _rx_buf.endswith(b'\xAA') else len(_rx_buf)]
+        _fill(ser, len(_rx_buf) + 1)
+    del _rx_buf[:i]
     # Read length
-    length_bytes = ser.read(2)
-    length = (length_bytes[0] << 8) | length_bytes[1]
-    body = ser.read(length)
-    checksum = ser.read(1)
-    # Verify checksum
-    checksum_base = length_bytes[0] + length_bytes[1] + sum(body)
-    expected_checksum = (0xFF - (checksum_base & 0xFF)) & 0xFF
-    if checksum[0] != expected_checksum:
+    _fill(ser, 4)
+    length = int.from_bytes(_rx_buf[2:4], 'big')
+    # Body and checksum
+    _fill(ser, 4 + length + 1)
+    body = bytes(_rx_buf[4:4 + length])
+    received_checksum = _rx_buf[4 + length]
+    del _rx_buf[:4 + length + 1]
+    # Verify checksum: length bytes, body and checksum sum to 0xFF (mod 256)
+    if ((length >> 8) + (length & 0xFF) + sum(body) + received_checksum) & 0xFF != 0xFF:
         raise ValueError("Checksum mismatch!")
     return body
 
@@ -54,23 +79,30 @@ def main():
         print(f"Error opening port: {e}")
         sys.exit(1)
 
+    # USB-serial adapters hold received bytes for up to 16 ms by default; ask the
+    # driver to deliver them immediately. Only pyserial's Linux backend has this
+    # (ASYNC_LOW_LATENCY), and not every adapter driver accepts it.
+    if hasattr(ser, 'set_low_latency_mode'):
+        try:
+            ser.set_low_latency_mode(True)
+        except (OSError, ValueError) as e:
+            print(f"Low-latency mode not available: {e}")
+
     # Enable user control
-    pkt_enable = build_packet([0x08, 0x01])
-    ser.write(pkt_enable)
+    ser.write(PKT_ENABLE)
     _ = read_response(ser, expected_len=2)  # Ignore response
 
-    # Read model number
-    pkt_model = build_packet([0x07, 0x02])
-    ser.write(pkt_model)
+    # Read model and serial number: both requests go out in one write and the
+    # replies are read back in order (user control is already enabled above)
+    ser.write(PKT_MODEL + PKT_SERIAL)
+    ser.flush()
+
     resp_model = read_response(ser, expected_len=18)
-    model_str = bytes(resp_model[2:]).decode('ascii').rstrip()
+    model_str = resp_model[2:].rstrip(TEXT_PADDING).decode('ascii')
     print(f"Model Number: {model_str}")
 
-    # Read serial number
-    pkt_serial = build_packet([0x07, 0x03])
-    ser.write(pkt_serial)
     resp_serial = read_response(ser, expected_len=18)
-    serial_str = bytes(resp_serial[2:]).decode('ascii').rstrip()
+    serial_str = resp_serial[2:].rstrip(TEXT_PADDING).decode('ascii')
     print(f"Serial Number: {serial_str}")
 
     ser.close()
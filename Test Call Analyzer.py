@@ -1,4 +1,5 @@
 from Analyzer import scan_frequency_range
+from tpi_scan import to_tuples
 
 
 def main():
@@ -18,15 +19,13 @@ def main():
 
     try:
         # Perform the scan
-        results = scan_frequency_range(**SCAN_PARAMS)
-        
-        # Separate frequencies and power levels
-        frequencies = [r[0] for r in results]
-        power_levels = [r[1] for r in results]
-        
-        print(results)
-        print(frequencies)
-        print(power_levels)
+        frequencies, power_levels = scan_frequency_range(**SCAN_PARAMS)
+
+        # to_tuples works with or without numpy
+        points = to_tuples(frequencies, power_levels)
+        print(points)
+        print([freq for freq, _ in points])
+        print([level for _, level in points])
         
     except Exception as e:
         print(f"Error occurred: {str(e)}")
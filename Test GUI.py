@@ -10,7 +10,6 @@ from Analyzer_Granular import (
     FrequencyScanner, 
     get_highest_baseline,
     subtract_baseline,
-    calculate_vswr,
     add_vswr_criterion_points,
     interpolated,
     get_vswr_at_frequency,
@@ -30,6 +29,10 @@ class VSWRAnalyzer(tk.Tk):
         # Add initialization of current_params
         self.current_params = None
 
+        # Parsed params.txt, re-read only when the file's modification time changes
+        self._params_cache = None
+        self._params_mtime = None
+
         self.title("VSWR Analyzer")
         self.geometry("1200x800")
 
@@ -198,12 +201,24 @@ class VSWRAnalyzer(tk.Tk):
         self.ax.set_xlabel("Frequency (kHz)")
         self.ax.set_ylabel("VSWR")
 
+        self.ax.grid(True)
+
         # Set fixed Y-axis limits
         self.ax.set_ylim(1.0, 2.0)
 
         self.canvas = FigureCanvasTkAgg(self.figure, self.plot_frame)
         self.canvas.get_tk_widget().pack(fill='both', expand=True)
 
+        # Each scan only redraws the data line (blitting) over a saved copy of the rest of
+        # the plot; the copy is redrawn when the limits, frequency span, colour or size change
+        self._line, = self.ax.plot([], [], '-o', markersize=2)  # Reduced marker size from default to 3
+        self._limit_lines = []
+        self._limits = None
+        self._x_range = None
+        self._facecolor = 'white'
+        self._background = None
+        self.canvas.mpl_connect('resize_event', self._invalidate_background)
+
     def toggle_device_type(self):
         """Toggle between E-Dot and E-Sq"""
         current = self.device_type.get()
@@ -253,26 +268,40 @@ class VSWRAnalyzer(tk.Tk):
             self.perform_scan()  # Your existing scan function
             self.after_id = self.after(100, self.perform_continuous_scan)  # Schedule next scan in 100ms
 
-    def get_params(self, combined_type: str) -> dict:
-        """Get scanning parameters based on the combined type from a configuration file"""
-
-
-        # Try to load parameters from file
+    def _load_params_file(self) -> dict:
+        """Return the parsed params.txt, reading the file again only if it changed since the last load"""
         try:
-            with open('params.txt', 'r') as f:
-                params = json.load(f)
+            mtime = os.stat('params.txt').st_mtime_ns
         except FileNotFoundError:
             raise FileNotFoundError("params.txt not found. Please ensure the configuration file exists.")
-        except json.JSONDecodeError:
-            raise ValueError("Invalid JSON format in params.txt. Please check the file format.")
+
+        if self._params_cache is None or mtime != self._params_mtime:
+            try:
+                with open('params.txt', 'r') as f:
+                    params = json.load(f)
+            except FileNotFoundError:
+                raise FileNotFoundError("params.txt not found. Please ensure the configuration file exists.")
+            except json.JSONDecodeError:
+                raise ValueError("Invalid JSON format in params.txt. Please check the file format.")
+            self._params_cache = params
+            self._params_mtime = mtime
+
+        return self._params_cache
+
+    def get_params(self, combined_type: str) -> dict:
+        """Get scanning parameters based on the combined type from a configuration file"""
+
+        # Cached unless params.txt was edited, so this is cheap enough to call every scan
+        params = self._load_params_file()
 
         # Validate that the requested combined_type exists
         if combined_type not in params:
             raise KeyError(f"Configuration for {combined_type} not found in params.txt")
 
-        # Store the current parameters and update display
-        self.current_params = params[combined_type]
-        self.update_params_display()
+        # Store the current parameters; rebuild the display only when they changed
+        if params[combined_type] is not self.current_params:
+            self.current_params = params[combined_type]
+            self.update_params_display()
         return self.current_params
 
     def update_params_display(self):
@@ -348,42 +377,81 @@ class VSWRAnalyzer(tk.Tk):
 
     def plot_vswr_data(self, frequencies, vswr):
         """Plot VSWR data"""
-        self.ax.clear()
-        self.ax.plot(frequencies, vswr, '-o', markersize=2)  # Reduced marker size from default to 3
-        self.ax.set_title("VSWR")
-        self.ax.set_xlabel("Frequency (kHz)")
-        self.ax.set_ylabel("VSWR")
-        self.ax.grid(True)
-
-        # Set fixed Y-axis limits after clearing
-        self.ax.set_ylim(1.0, 2.0)
-
-        # Add horizontal line at vswr_max
-        self.ax.axhline(y=self.current_params['vswr_max'], color='r', linestyle='--', label='VSWR Max')
-
-        # Add vertical lines for vswr_start_khz and vswr_stop_khz
-        self.ax.axvline(x=self.current_params['vswr_start_khz'], color='g', linestyle='--', label='Start')
-        self.ax.axvline(x=self.current_params['vswr_stop_khz'], color='g', linestyle='--', label='Stop')
+        self._line.set_data(frequencies, vswr)
+
+        # Restore the title after it was changed for a saved plot
+        if self.ax.get_title() != "VSWR":
+            self.ax.set_title("VSWR")
+            self._background = None
+
+        # Limit lines only change with the parameters
+        limits = (self.current_params['vswr_max'],
+                  self.current_params['vswr_start_khz'],
+                  self.current_params['vswr_stop_khz'])
+        if limits != self._limits:
+            for line in self._limit_lines:
+                line.remove()
+
+            self._limit_lines = [
+                # Add horizontal line at vswr_max
+                self.ax.axhline(y=limits[0], color='r', linestyle='--', label='VSWR Max'),
+                # Add vertical lines for vswr_start_khz and vswr_stop_khz
+                self.ax.axvline(x=limits[1], color='g', linestyle='--', label='Start'),
+                self.ax.axvline(x=limits[2], color='g', linestyle='--', label='Stop'),
+            ]
+            self.ax.legend()
+            self._limits = limits
+            self._x_range = None
+
+        # Rescale the X axis only when the frequency span changes (Y limits stay fixed)
+        x_range = (frequencies[0], frequencies[-1], len(frequencies)) if len(frequencies) else None
+        if x_range != self._x_range:
+            self.ax.relim()
+            self.ax.autoscale_view(scaley=False)
+            self._x_range = x_range
+            self._background = None
+
+        if self._background is None:
+            self._redraw_background()
+        else:
+            self.canvas.restore_region(self._background)
+            self.ax.draw_artist(self._line)
+            self.canvas.blit(self.ax.bbox)
 
-        self.ax.legend()
+    def _redraw_background(self):
+        """Full redraw; the plot without the data line is saved as the background for blitting"""
+        self._line.set_visible(False)
         self.canvas.draw()
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._line.set_visible(True)
+        self.ax.draw_artist(self._line)
+        self.canvas.blit(self.ax.bbox)
+
+    def _invalidate_background(self, event=None):
+        """Force a full redraw on the next plot update (e.g. after the window is resized)"""
+        self._background = None
+
+    def _set_plot_color(self, color):
+        """Change the plot background colour, redrawing only if it actually changed"""
+        if color == self._facecolor:
+            return
+        self._facecolor = color
+        self.ax.set_facecolor(color)
+        self._redraw_background()
 
     def highlight_failed_plot(self):
         """Add red background to plot for failed tests"""
-        self.ax.set_facecolor('mistyrose')
-        self.canvas.draw()
+        self._set_plot_color('mistyrose')
         self.update_test_results("Failed: VSWR exceeds limit")
 
     def highlight_good_plot(self):
         """Add green background to plot for passing tests"""
-        self.ax.set_facecolor('lightgreen')
-        self.canvas.draw()
+        self._set_plot_color('lightgreen')
         self.update_test_results("Good: VSWR within limit")
 
     def highlight_normal_plot(self):
         """Add white background to plot for normal times tests"""
-        self.ax.set_facecolor('white')
-        self.canvas.draw()
+        self._set_plot_color('white')
 
     def mark_save(self):
         """Handle SAVE button click"""
@@ -462,7 +530,7 @@ class VSWRAnalyzer(tk.Tk):
         try:
             # Calculate min, max, and mid VSWR values
             print(self.vswr_data)
-            vswr_results = [v[1] for v in self.vswr_data]
+            vswr_results = self.vswr_data.vals
 
             print(self.current_params['vswr_start_khz'])
             print(self.current_params['vswr_stop_khz'])
@@ -599,7 +667,8 @@ class VSWRAnalyzer(tk.Tk):
         params = self.get_params(f"{self.device_type.get()}-{self.test_type.get()}")
 
         try:
-            # Use the run method instead of perform_scan
+            # Use the run method instead of perform_scan; the Scan (frequency and value
+            # arrays) is passed through every processing step without converting to tuples
             raw_results = self.scanner.run(
                 params['start_khz'],
                 params['step_khz']
@@ -611,8 +680,7 @@ class VSWRAnalyzer(tk.Tk):
                 baseline_corrected = subtract_baseline(raw_results, self.baseline)
 
                 # Convert return loss measurements to VSWR values
-                vswr_results = [(freq, calculate_vswr(return_loss))
-                               for freq, return_loss in baseline_corrected]
+                vswr_results = process_vswr_data(baseline_corrected)
                 # print(f"vswr_results: {vswr_results}")
                 # Apply smoothing with required frequency parameters
 
@@ -621,7 +689,9 @@ class VSWRAnalyzer(tk.Tk):
                 vswr_results = interpolated(
                     vswr_results,
                     interpolation_factor=3,
-                    method= choice  # or 'spline' or 'none'
+                    method= choice,  # or 'spline' or 'none'
+                    assume_sorted=True,
+                    rounded=False
                 )
 
                 vswr_results = add_vswr_criterion_points(
@@ -629,6 +699,8 @@ class VSWRAnalyzer(tk.Tk):
                     params['vswr_start_khz'],
                     params['vswr_stop_khz'],
                     params['vswr_mid_khz'],
+                    assume_sorted=True,
+                    rounded=False
                 )
 
                 vswr_results = smoothed(
@@ -648,9 +720,8 @@ class VSWRAnalyzer(tk.Tk):
 
                 # print(f"vswr_results: {vswr_results}")
 
-                # Extract frequencies and VSWR values for plotting
-                frequencies = [r[0] for r in vswr_results]
-                vswr = [r[1] for r in vswr_results]
+                # Frequencies and VSWR values for plotting
+                frequencies, vswr = vswr_results
                 
                 # Update the plot
                 self.plot_vswr_data(frequencies, vswr)
@@ -671,7 +742,8 @@ class VSWRAnalyzer(tk.Tk):
                 
                 # Store last successful scan data if passed
                 if passed:
-                    self.last_scan_data = self.vswr_data.copy()  # Make a copy of the data
+                    # Each scan builds new arrays and none are modified in place, so no copy is needed
+                    self.last_scan_data = self.vswr_data
                 # Handle consecutive passes
                 if passed:
                     self.consecutive_passes += 1
@@ -691,8 +763,7 @@ class VSWRAnalyzer(tk.Tk):
                     self.consecutive_passes = 0
             else:
                 # If no baseline, just plot raw data
-                frequencies = [r[0] for r in raw_results]
-                values = [r[1] for r in raw_results]
+                frequencies, values = raw_results
                 self.plot_vswr_data(frequencies, values)
 
             self.save_btn.config(state='normal') #allow saving
@@ -0,0 +1,116 @@
+"""
+Packet parsing in tpi_controller2, fed with a real analyzer capture through a fake serial port.
+"""
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import tpi_controller2  # noqa: E402
+from tpi_controller2 import TPIController  # noqa: E402
+
+# One sweep as captured from the analyzer (see Notes): data packets of 40, 40 and 20 points,
+# then the analyzer stopped packet. The length field of each data packet is 2 bytes short
+# of its body, as the analyzer sends them.
+REAL_SWEEP = bytes.fromhex(
+    'aa5500a5073e2800000000367a64c1064264c164b264c164b264c1367a64c1d60964c1281062c164b264c1'
+    '367a64c1f45a65c1162963c1f45a65c1769963c1466163c1064264c1064264c1d60964c1367a64c1d60964c1'
+    '94ea64c1367a64c1a6d163c194ea64c1064264c1c42265c1b8b862c1064264c1d60964c1e6f062c1466163c1'
+    '064264c1f45a65c1d60964c1064264c1162963c164b264c1840366c164b264c1064264c194ea64c111'
+    'aa5500a5073e282800000094ea64c1840366c1249365c164b264c1d60964c1840366c1a6d163c1064264c1'
+    '94ea64c1840366c112ac66c1249365c1d60964c1a6d163c1f45a65c1c42265c1249365c164b264c164b264c1'
+    '42e466c1e27366c1c42265c154cb65c1b43b66c1840366c1c42265c1840366c1b43b66c1249365c1c42265c1'
+    '249365c112ac66c1249365c1e27366c1a25467c194ea64c1f45a65c1840366c1249365c1e27366c12f'
+    'aa550055073e1450000000840366c1d28c67c1249365c164b264c1b43b66c1b43b66c132fd67c1c42265c1'
+    'd28c67c142e466c1840366c1d28c67c1e27366c112ac66c1721c67c154cb65c102c567c132fd67c112ac66c1'
+    'd28c67c112'
+    'aa550002073fb7'
+)
+
+# (first step, point count, offset of the first float) of each data packet in REAL_SWEEP
+_PACKETS = ((0, 40, 11), (40, 40, 11 + 172), (80, 20, 11 + 2 * 172))
+
+
+def _expected_points():
+    """Step -> dBm decoded directly from the packet layout."""
+    points = {}
+    for first_step, n_points, offset in _PACKETS:
+        for i, value in enumerate(struct.unpack_from(f'<{n_points}f', REAL_SWEEP, offset)):
+            points[first_step + i] = value
+    return points
+
+
+class FakeSerial:
+    """Serves a fixed byte stream in small chunks, like a USB-serial port."""
+
+    def __init__(self, data, chunk=37):
+        self._data = bytearray(data)
+        self._chunk = chunk
+        self._lock = threading.Lock()
+        self.timeout = 1
+
+    @property
+    def in_waiting(self):
+        with self._lock:
+            return min(len(self._data), self._chunk)
+
+    def read(self, size=1):
+        with self._lock:
+            out = bytes(self._data[:min(size, self._chunk)])
+            del self._data[:len(out)]
+        if not out:
+            time.sleep(0.01)  # an idle port blocks until its timeout
+        return out
+
+
+def _controller(data):
+    tpi = TPIController.__new__(TPIController)
+    tpi.port = 'FAKE'
+    tpi.ser = FakeSerial(data)
+    tpi.last_params = None
+    tpi._capture_buf = bytearray()
+    return tpi
+
+
+def test_read_analyzer_data_v2_parses_real_capture():
+    assert tpi_controller2.VERIFY_CHECKSUM
+    assert _controller(REAL_SWEEP).read_analyzer_data_v2(verbose=False) == _expected_points()
+
+
+def test_read_analyzer_data_v2_dense_array():
+    points = _controller(REAL_SWEEP).read_analyzer_data_v2(verbose=False, num_points=100)
+    assert list(points) == list(_expected_points().values())
+
+
+def test_iter_points_until_stopped_yields_frequency_pairs():
+    tpi = _controller(REAL_SWEEP)
+    tpi.last_params = {'start_khz': 1_606_250, 'step_khz': 300}
+
+    expected = [(step, 1_606_250 + step * 300, value) for step, value in _expected_points().items()]
+    assert list(tpi.iter_points_until_stopped()) == expected
+
+
+def test_capture_analyzer_packet_frames_real_capture():
+    tpi = _controller(REAL_SWEEP)
+    packets = [tpi.capture_analyzer_packet(timeout=0.05) for _ in range(4)]
+
+    assert [len(p) for p in packets] == [172, 172, 92, 7]
+    assert b''.join(packets) == REAL_SWEEP
+    assert tpi.capture_analyzer_packet(timeout=0.05) == b''
+
+
+def test_capture_buffer_cleared_when_sweep_starts():
+    start_ack = bytes.fromhex('aa550002083d') + bytes([tpi_controller2._checksum(2, b'\x08\x3D')])
+    tpi = _controller(start_ack + REAL_SWEEP)
+    tpi.ser._chunk = len(start_ack)  # the command response is read in one go
+    tpi.ser.reset_input_buffer = lambda: None
+    tpi.ser.write = lambda data: len(data)
+    # Leftover partial packet from an aborted sweep
+    tpi._capture_buf += REAL_SWEEP[:100]
+
+    tpi.start_analyzer_v2()
+    tpi.ser._chunk = 37
+    assert tpi.capture_analyzer_packet(timeout=0.05) == REAL_SWEEP[:172]
@@ -1,6 +1,9 @@
 import serial
 import struct
 
+from tpi_controller2 import _point_struct
+
+
 class TPIController:
     def __init__(self, port, timeout=2):
         self.ser = serial.Serial(
@@ -306,16 +309,17 @@ class TPIController:
                         print("Malformed data packet, too short.")
                     continue
                 n_points = body[2]
-                first_step = int.from_bytes(body[3:7], 'little')
-                data_bytes = body[7:]
+                # Parse through a view so the payload is never copied
+                mv = memoryview(body)
+                first_step = int.from_bytes(mv[3:7], 'little')
                 expected_len = n_points * 4
-                if len(data_bytes) < expected_len:
+                if len(mv) - 7 < expected_len:
                     if verbose:
                         print("Incomplete data points, skipping packet.")
                     continue
-                for i in range(n_points):
-                    val_bytes = data_bytes[i * 4:(i + 1) * 4]
-                    dBm = struct.unpack('<f', val_bytes)[0]
+                # One C-level unpack for the whole packet
+                values = _point_struct(n_points).unpack_from(mv, 7)
+                for i, dBm in enumerate(values):
                     all_points[first_step + i] = dBm
                 if verbose:
                     print(f"Received packet with {n_points} points starting at step {first_step}.")
@@ -347,10 +351,9 @@ class TPIController:
         if resp[0:2] != b'\x07\x39':
             raise RuntimeError("Unexpected analyzer data response")
 
-        data_bytes = resp[2:]
+        data_bytes = memoryview(resp)[2:]
         num_points = len(data_bytes) // 4
-        data = [struct.unpack('<f', data_bytes[i * 4:i * 4 + 4])[0]
-                for i in range(num_points)]
+        data = [v for (v,) in struct.iter_unpack('<f', data_bytes[:num_points * 4])]
         return data
 
     def wait_for_analyzer_stop(self, timeout=10):
@@ -1,7 +1,195 @@
+import array
 import serial
 import struct
+import threading
 import time
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Compiled struct.Struct per packet point count, so each format is parsed only once
+_POINT_STRUCTS = {}
+
+
+def _point_struct(n_points):
+    """Return the cached struct.Struct for n_points little-endian float32 values."""
+    s = _POINT_STRUCTS.get(n_points)
+    if s is None:
+        s = _POINT_STRUCTS[n_points] = struct.Struct(f'<{n_points}f')
+    return s
+
+
+# Driver receive/transmit buffer size requested when the port is opened (Windows only)
+SERIAL_BUFFER_SIZE = 1 << 16
+
+# Packet header: two magic bytes and a big-endian body length
+_HDR = struct.Struct('>BBH')
+_LENGTH = struct.Struct('>H')
+
+# Data packet body after the command bytes: point count and first scan step (LE)
+_DATA_HDR = struct.Struct('<BI')
+
+# Command bytes of the analyzer stopped packet
+_CMD_STOP = b'\x07\x3F'
+# Analyzer data and stopped commands as 16-bit ints, compared without slicing the body
+_CMD_DATA_ID = 0x073E
+_CMD_STOP_ID = 0x073F
+
+# Verify the checksum of streamed analyzer packets. The 3 Mbaud link to the
+# analyzer's USB bridge is a plain UART, and checksum failures are also what
+# rejects misframed packets, so only turn this off on a known-clean link
+VERIFY_CHECKSUM = True
+
+# Bodies at least this long are summed with numpy; below it the fixed cost of
+# numpy outweighs the per-byte cost of sum() (analyzer data bodies are ~200 bytes)
+NUMPY_CHECKSUM_MIN_BYTES = 1024
+
+
+def _checksum(length, body):
+    """Packet checksum: 0xFF minus the low byte of the sum of both length bytes and the body."""
+    if np is not None and len(body) >= NUMPY_CHECKSUM_MIN_BYTES and not isinstance(body, list):
+        total = int(np.frombuffer(body, dtype=np.uint8).sum(dtype=np.uint64))
+    else:
+        total = sum(body)
+    return (0xFF - (((length >> 8) + (length & 0xFF) + total) & 0xFF)) & 0xFF
+
+
+def make_data_parser(num_points):
+    """
+    Build a parser specialised for one sweep of num_points steps. It writes analyzer data
+    packet bodies (07 3E, point count, first step, float32 readings) straight into a
+    preallocated per-step array, with everything it needs bound in the closure.
+    Returns (parse, points): parse(body) stores one packet and returns
+    (n_points, first_step), or None if the body is too short for its point count;
+    points is the array.array('f') being filled, NaN for steps not received yet.
+    """
+    points = array.array('f', [float('nan')]) * num_points
+    # numpy view of the same storage, so payloads are copied in without float objects
+    points_np = np.frombuffer(points, dtype=np.float32) if np is not None else None
+    frombuffer = np.frombuffer if np is not None else None
+    unpack_data_header = _DATA_HDR.unpack_from
+    point_struct = _point_struct
+
+    def parse(body):
+        n_points, first_step = unpack_data_header(body, 2)
+        if len(body) - 7 < n_points * 4:
+            return None
+        # Steps past num_points are dropped rather than growing the array
+        last = min(first_step + n_points, num_points)
+        if last > first_step:
+            if points_np is not None:
+                points_np[first_step:last] = frombuffer(body, dtype='<f4', count=last - first_step, offset=7)
+            else:
+                values = point_struct(n_points).unpack_from(body, 7)
+                points[first_step:last] = array.array('f', values[:last - first_step])
+        return n_points, first_step
+
+    return parse, points
+
+
+def _packet_size(buf, start=0):
+    """
+    Size of the packet at buf[start:] (which begins with AA 55), header to checksum,
+    or None until enough of it has arrived to tell. Data packets (07 3E) are sized from
+    their point count, as the analyzer's length field for them is wrong (see
+    tpi_scan.extract_point_data); every other packet from its length field.
+    """
+    if len(buf) < start + 6:
+        return None
+    if buf[start + 4] == 0x07 and buf[start + 5] == 0x3E:
+        if len(buf) < start + 7:
+            return None
+        return 11 + 4 * buf[start + 6] + 1
+    length, = _LENGTH.unpack_from(buf, start + 2)
+    return 4 + length + 1
+
+
+class SerialRingReader:
+    """
+    Drains a serial port on a background thread into a fixed-size ring buffer, so bytes
+    keep being pulled from the OS while the caller is busy parsing. Use as a context
+    manager; read() hands over everything received so far.
+    """
+
+    def __init__(self, ser, size=65536):
+        self.ser = ser
+        self._ring = bytearray(size)
+        self._size = size
+        self._head = 0  # total bytes written into the ring
+        self._tail = 0  # total bytes handed to the consumer
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._error = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        ring, size = self._ring, self._size
+        try:
+            while not self._stop.is_set():
+                data = self.ser.read(max(1, min(self.ser.in_waiting, size)))
+                if not data:
+                    continue
+                n = len(data)
+                with self._cond:
+                    # Consumer is a full ring behind: wait for it to catch up
+                    while self._head + n - self._tail > size and not self._stop.is_set():
+                        self._cond.wait(0.1)
+                    start = self._head % size
+                    first = min(n, size - start)
+                    ring[start:start + first] = data[:first]
+                    ring[:n - first] = data[first:]
+                    self._head += n
+                    self._cond.notify_all()
+        except Exception as e:
+            with self._cond:
+                self._error = e
+                self._cond.notify_all()
+
+    def read(self, timeout=None):
+        """
+        Return all bytes received since the last call, waiting up to `timeout` seconds
+        for at least one. Returns b'' on timeout; re-raises a reader thread error.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._head != self._tail or self._error is not None, timeout)
+            if self._head == self._tail:
+                if self._error is not None:
+                    raise self._error
+                return b''
+            start = self._tail % self._size
+            end = start + (self._head - self._tail)
+            if end <= self._size:
+                data = bytes(self._ring[start:end])
+            else:
+                # Wrapped around: stitch the two pieces together
+                data = bytes(self._ring[start:]) + bytes(self._ring[:end - self._size])
+            self._tail = self._head
+            self._cond.notify_all()
+            return data
+
+
 class TPIController:
     def __init__(self, port, baudrate=3000000, timeout=1, retries=3, retry_delay=2):
         """
@@ -9,6 +197,8 @@ class TPIController:
         """
         self.port = port
         self.ser = None
+        self.last_params = None  # analyzer parameters last sent by set_analyzer_parameters_v2
+        self._capture_buf = bytearray()  # bytes received past the last packet capture_analyzer_packet returned
 
         for attempt in range(1, retries + 1):
             try:
@@ -24,6 +214,11 @@ class TPIController:
                 )
                 if self.ser.is_open:
                     print(f"Serial port {self.ser.name} opened successfully.")
+                    # Windows defaults to a 4 KiB driver receive buffer, which a sweep can
+                    # overrun if Python is briefly descheduled; only pyserial's Windows
+                    # backend has set_buffer_size, other platforms keep their defaults
+                    if hasattr(self.ser, 'set_buffer_size'):
+                        self.ser.set_buffer_size(rx_size=SERIAL_BUFFER_SIZE, tx_size=SERIAL_BUFFER_SIZE)
                     break
             except serial.SerialException as e:
                 print(f"SerialException on attempt {attempt}: {e}")
@@ -44,7 +239,7 @@ class TPIController:
     def _build_packet(self, body_bytes):
         length = len(body_bytes)
         header = bytearray([0xAA, 0x55, (length >> 8) & 0xFF, length & 0xFF])
-        chk = (0xFF - ((header[2] + header[3] + sum(body_bytes)) & 0xFF)) & 0xFF
+        chk = _checksum(length, body_bytes)
         return header + bytearray(body_bytes) + bytes([chk])
 
     def _send_command(self, body_bytes):
@@ -52,7 +247,10 @@ class TPIController:
         pkt = self._build_packet(body_bytes)
         if verbose:
             print(f"Sending packet: {pkt.hex()}")
+        # Drop stale input, including bytes capture_analyzer_packet kept from an earlier
+        # or aborted sweep, so a new sweep or parameter write starts from a clean stream
         self.ser.reset_input_buffer()
+        self._capture_buf.clear()
         self.ser.write(pkt)
         return self._read_response()
 
@@ -64,10 +262,10 @@ class TPIController:
 
         if len(header) < 4:
             raise RuntimeError("Timeout waiting for response header.")
-        if header[0] != 0xAA or header[1] != 0x55:
+        magic0, magic1, length = _HDR.unpack_from(header)
+        if magic0 != 0xAA or magic1 != 0x55:
             raise RuntimeError(f"Invalid response header: {header.hex()}")
 
-        length = (header[2] << 8) | header[3]
         body = self.ser.read(length)
         if verbose:
             print(f"Body received: {body.hex()}")  # Print body bytes
@@ -81,7 +279,7 @@ class TPIController:
 
         if len(checksum) < 1:
             raise RuntimeError("Timeout reading checksum.")
-        chk = (0xFF - ((header[2] + header[3] + sum(body)) & 0xFF)) & 0xFF
+        chk = _checksum(length, body)
         if checksum[0] != chk:
             raise RuntimeError("Checksum mismatch.")
         return body
@@ -144,12 +342,16 @@ class TPIController:
         if resp[:2] != b'\x08\x0D':
             raise RuntimeError(f"Failed to set detector state: {resp.hex()}")
 
-    def set_analyzer_parameters_v2(self, start_khz, stop_khz, step_khz, dwell_ms, num_points, auto_rf, max_points_per_packet, averages_per_point):
+    def set_analyzer_parameters_v2(self, start_khz, stop_khz, step_khz, dwell_ms, num_points, auto_rf, max_points_per_packet, averages_per_point, verify=False):
         """It may seem redundant to specify the number of points to measure as that
          information can be surmised from the stop frequency and the step frequency.
           However, it is up to the user to calculate this and supply the total number
            of points to be measured. Note that, for example, a scan from 100 MHz to
-            200 MHz with a step frequency of 1 MHz will measure 101 points."""
+            200 MHz with a step frequency of 1 MHz will measure 101 points.
+
+        The parameters sent (after clamping) are kept in self.last_params, in the same
+        form read_analyzer_parameters_v2 returns, so they needn't be read back. Pass
+        verify=True to read them back anyway and raise if the analyzer disagrees."""
 
         if dwell_ms < 2 or dwell_ms > 500:
             raise ValueError("Dwell time out of range.")
@@ -172,6 +374,22 @@ class TPIController:
         if resp[:2] != b'\x08\x3C':
             raise RuntimeError("Failed to set analyzer parameters.")
 
+        self.last_params = {
+            "start_khz": start_khz,
+            "stop_khz": stop_khz,
+            "step_khz": step_khz,
+            "dwell_ms": dwell_ms,
+            "num_points": num_points,
+            "auto_rf": 1 if auto_rf else 0,
+            "max_points_per_packet": max_points_per_packet,
+            "averages_per_point": averages_per_point
+        }
+        if verify:
+            readback = self.read_analyzer_parameters_v2()
+            if readback != self.last_params:
+                raise RuntimeError(f"Analyzer parameters not applied: sent {self.last_params}, read {readback}")
+        return self.last_params
+
     def read_analyzer_parameters_v2(self):
         resp = self._send_command([0x07,0x3C])
         if resp[:2] != b'\x07\x3C':
@@ -197,50 +415,53 @@ class TPIController:
     def capture_packets_until_stopped(self, verbose=True):
         """
         Captures packets until the analyzer stopped packet is received.
-        Prints each packet in hex.
+        Prints each packet in hex when verbose.
         """
         self.ser.timeout = 2  # or longer if you want
         packet_count = 0
 
+        # Bind hot lookups to locals once, outside the packet loop
+        read = self.ser.read
+        unpack_header = _HDR.unpack_from
+
         while True:
-            header = self.ser.read(4)
+            header = read(4)
             if len(header) < 4:
                 if verbose:
                     print("Timeout waiting for header.")
                 continue
-            if header[0] != 0xAA or header[1] != 0x55:
+            magic0, magic1, length = unpack_header(header)
+            if magic0 != 0xAA or magic1 != 0x55:
                 if verbose:
                     print(f"Ignoring invalid header: {header.hex()}")
                 continue
 
-            length = (header[2] << 8) | header[3]
-            body = self.ser.read(length)
+            body = read(length)
             if len(body) < length:
                 if verbose:
                     print("Incomplete body.")
                 continue
 
-            checksum = self.ser.read(1)
+            checksum = read(1)
             if len(checksum) < 1:
                 if verbose:
                     print("Missing checksum.")
                 continue
 
             # Validate checksum
-            chk = (0xFF - ((header[2] + header[3] + sum(body)) & 0xFF)) & 0xFF
-            if checksum[0] != chk:
+            if VERIFY_CHECKSUM and checksum[0] != _checksum(length, body):
                 if verbose:
                     print("Checksum error, skipping packet.")
                 continue
 
             packet_count += 1
-            print(f"\nPacket #{packet_count}:")
-            print(f"Header: {header.hex()}")
-            print(f"Body: {body.hex()}")
-            print(f"Checksum: {checksum[0]:02X}")
+            if verbose:
+                print(f"\nPacket #{packet_count}:")
+                print(f"Header: {header.hex()}")
+                print(f"Body: {body.hex()}")
+                print(f"Checksum: {checksum[0]:02X}")
 
-            cmd = body[:2]
-            if cmd == b'\x07\x3F':
+            if body.startswith(_CMD_STOP):
                 if verbose:
                     print("Analyzer stopped.")
                 break
@@ -263,106 +484,190 @@ class TPIController:
 
         return bytes(all_data)
 
-    def read_analyzer_data_v2(self, verbose=True, dump_raw=False):
+    def capture_analyzer_packet(self, timeout=0.1):
         """
-        Reads analyzer data packets until the analyzer stopped packet is received.
-        Returns a dict: {scan_step: dBm}
-        If repeated timeouts occur, returns None.
+        Returns the next complete packet from the analyzer, header to checksum, as a bytes
+        object, or b'' if no further bytes arrive for `timeout` seconds before it completes.
+        Packets are framed from their header and point count / length, so exactly one
+        packet is returned however the bytes were split across USB transfers. Bytes past
+        the packet, and a partial packet left by a timeout, are kept for the next call.
         """
-        all_points = {}
-        self.ser.timeout = 2  # 2-second read timeout
-
-        timeout_count = 0
+        ser = self.ser  # only bytes already waiting are read, so reads never block
+        buf = self._capture_buf
+        deadline = time.perf_counter() + timeout
 
         while True:
-            b1 = self.ser.read(1)
-            if not b1:
-                timeout_count += 1
-                if verbose:
-                    print("Timeout waiting for packet header.")
-                if timeout_count > 2:
-                    if verbose:
-                        print("Too many consecutive timeouts. Aborting.")
-                    return None
-                continue
-            timeout_count = 0  # reset on any successful read
+            start = buf.find(b'\xAA\x55')
+            if start < 0:
+                # Nothing to frame; keep a trailing 0xAA as it may start the next header
+                del buf[:len(buf) - 1 if buf.endswith(b'\xAA') else len(buf)]
+            else:
+                del buf[:start]
+                size = _packet_size(buf)
+                if size is not None and len(buf) >= size:
+                    packet = bytes(buf[:size])
+                    del buf[:size]
+                    return packet
+
+            waiting = ser.in_waiting
+            if waiting:
+                buf += ser.read(waiting)
+                deadline = time.perf_counter() + timeout
+            elif time.perf_counter() >= deadline:
+                return b''
+            else:
+                time.sleep(0.001)
 
-            if b1 != b'\xAA':
-                continue
+    def capture_analyzer_until(self, terminator=b'\xAA\x55\x00\x02\x07\x3F\xB7', timeout=6.0):
+        """
+        Captures raw bytes from the serial port until the stream ends with `terminator`
+        (the analyzer stopped packet by default) or `timeout` seconds elapse.
+        Returns a bytes object.
+        """
+        self.ser.timeout = 0.1  # Short timeout so the deadline is honoured
+        end_time = time.time() + timeout
+        all_data = bytearray()
 
-            b2 = self.ser.read(1)
-            if not b2:
-                timeout_count += 1
-                if verbose:
-                    print("Timeout waiting for second header byte.")
-                if timeout_count > 2:
-                    if verbose:
-                        print("Too many consecutive timeouts. Aborting.")
-                    return None
-                continue
-            if b2 != b'\x55':
-                continue
+        while not all_data.endswith(terminator) and time.time() < end_time:
+            chunk = self.ser.read(max(1, self.ser.in_waiting))
+            if chunk:
+                all_data.extend(chunk)
 
-            length_bytes = self.ser.read(2)
-            if len(length_bytes) < 2:
-                if verbose:
-                    print("Timeout reading length bytes.")
-                continue
-            length = (length_bytes[0] << 8) | length_bytes[1]
+        return bytes(all_data)
 
-            body = self.ser.read(length)
-            if len(body) < length:
-                if verbose:
-                    print("Incomplete body.")
-                continue
+    def read_analyzer_data_v2(self, verbose=True, dump_raw=False, num_points=None):
+        """
+        Reads analyzer data packets until the analyzer stopped packet is received.
+        Returns a dict: {scan_step: dBm}
+        When num_points is given, returns an array.array('f') of num_points readings
+        indexed by scan step instead (NaN for steps that were not received).
+        If repeated timeouts occur, returns None.
+        """
+        if num_points is None:
+            all_points = {}
+            parse_data = None
+        else:
+            # Dense per-step storage: index by step, no hashing and no sort afterwards
+            parse_data, all_points = make_data_parser(num_points)
 
-            checksum = self.ser.read(1)
-            if len(checksum) < 1:
-                if verbose:
-                    print("Missing checksum.")
-                continue
+        try:
+            for n_points, first_step, body in self._iter_data_packets(verbose, dump_raw):
+                if parse_data is not None:
+                    parse_data(body)
+                else:
+                    # One C-level unpack for the whole packet
+                    values = _point_struct(n_points).unpack_from(body, 7)
+                    for i, dBm in enumerate(values):
+                        all_points[first_step + i] = dBm
+        except TimeoutError:
+            return None
 
-            if dump_raw:
-                print("\n--- Raw Packet ---")
-                print(f"Header: aa55")
-                print(f"Length: {length}")
-                print(f"Body: {body.hex()}")
-                print(f"Checksum: {checksum[0]:02X}")
+        return all_points
 
-            chk = (0xFF - ((length_bytes[0] + length_bytes[1] + sum(body)) & 0xFF)) & 0xFF
-            if checksum[0] != chk:
-                if verbose:
-                    print("Checksum error.")
-                continue
+    def iter_points_until_stopped(self, verbose=False):
+        """
+        Yields (scan_step, frequency_khz, dBm) for each point as its data packet arrives,
+        until the analyzer stopped packet is received, so callers can stream-process a
+        sweep without collecting it first. Frequencies come from the parameters last
+        sent with set_analyzer_parameters_v2 (read from the analyzer if none were sent).
+        Raises TimeoutError after repeated timeouts.
+        """
+        params = self.last_params or self.read_analyzer_parameters_v2()
+        start_khz = params["start_khz"]
+        step_khz = params["step_khz"]
 
-            cmd = body[:2]
+        for n_points, first_step, body in self._iter_data_packets(verbose, False):
+            for i, dBm in enumerate(_point_struct(n_points).unpack_from(body, 7), first_step):
+                yield i, start_khz + i * step_khz, dBm
 
-            if cmd == b'\x07\x3E':
-                if len(body) < 7:
-                    if verbose:
-                        print("Malformed data packet.")
-                    continue
-                n_points = body[2]
-                first_step = int.from_bytes(body[3:7], 'little')
-                data_bytes = body[7:]
-                expected_len = n_points * 4
-                if len(data_bytes) < expected_len:
+    def _iter_data_packets(self, verbose, dump_raw):
+        """
+        Yields (n_points, first_step, body) for every valid analyzer data packet until
+        the analyzer stopped packet is received; body is a memoryview of the packet body.
+        Raises TimeoutError after three consecutive 2-second waits without data.
+        A SerialRingReader drains the port on a background thread; packets are parsed
+        out of the bytes it hands over, rather than issuing several reads per packet.
+        """
+        self.ser.timeout = 0.1  # Polled by the reader thread; waits for data below are 2 seconds
+
+        timeout_count = 0
+        buf = b''
+        pos = 0  # start of the unparsed part of buf
+
+        # Bind hot lookups to locals once, outside the packet loop
+        unpack_length = _LENGTH.unpack_from
+        packet_size = _packet_size
+        unpack_data_header = _DATA_HDR.unpack_from
+        checksum_of = _checksum
+        verify_checksum = VERIFY_CHECKSUM
+        data_cmd, stop_cmd = _CMD_DATA_ID, _CMD_STOP_ID
+
+        with SerialRingReader(self.ser) as reader:
+            read = reader.read
+            while True:
+                # Look for the next header in the buffered bytes
+                start = buf.find(b'\xAA\x55', pos)
+                if start < 0:
+                    # Nothing to parse; keep a trailing 0xAA as it may start the next header
+                    pos = len(buf) - 1 if buf.endswith(b'\xAA') else len(buf)
+                else:
+                    pos = start
+                    # Frame on the point count for data packets, whose length field is short
+                    size = packet_size(buf, start)
+                    end = start + size if size is not None and len(buf) >= start + size else None
+
+                    if end is not None:
+                        # A complete packet is buffered: header, body, checksum
+                        pos = end
+                        # The checksum covers the length field as sent, not the framed size
+                        length, = unpack_length(buf, start + 2)
+                        body = memoryview(buf)[start + 4:end - 1]
+                        checksum = buf[end - 1]
+
+                        if dump_raw:
+                            print("\n--- Raw Packet ---")
+                            print(f"Header: aa55")
+                            print(f"Length: {length}")
+                            print(f"Body: {body.hex()}")
+                            print(f"Checksum: {checksum:02X}")
+
+                        if verify_checksum and checksum != checksum_of(length, body):
+                            if verbose:
+                                print("Checksum error.")
+                            continue
+
+                        cmd = body[0] << 8 | body[1] if len(body) >= 2 else None
+
+                        if cmd == data_cmd:
+                            # Framing sized the body from its point count, so all points are there;
+                            # body is a view into the buffer, so nothing here copies the payload
+                            n_points, first_step = unpack_data_header(body, 2)
+                            yield n_points, first_step, body
+                            if verbose:
+                                print(f"Received {n_points} points starting at step {first_step}.")
+
+                        elif cmd == stop_cmd:
+                            if verbose:
+                                print("Analyzer stopped.")
+                            return
+
+                        else:
+                            if verbose:
+                                print(f"Ignoring unknown packet: {body[:2].hex()}")
+                        continue
+
+                # Need more bytes: take everything the reader thread has received so far
+                chunk = read(timeout=2)
+                if not chunk:
+                    timeout_count += 1
                     if verbose:
-                        print("Incomplete data points, skipping.")
+                        print("Timeout waiting for packet header." if start < 0 else "Incomplete body.")
+                    if timeout_count > 2:
+                        if verbose:
+                            print("Too many consecutive timeouts. Aborting.")
+                        raise TimeoutError("Too many consecutive timeouts waiting for analyzer data.")
                     continue
-                for i in range(n_points):
-                    dBm = struct.unpack('<f', data_bytes[i * 4:(i + 1) * 4])[0]
-                    all_points[first_step + i] = dBm
-                if verbose:
-                    print(f"Received {n_points} points starting at step {first_step}.")
-
-            elif cmd == b'\x07\x3F':
-                if verbose:
-                    print("Analyzer stopped.")
-                break
+                timeout_count = 0  # reset on any successful read
 
-            else:
-                if verbose:
-                    print(f"Ignoring unknown packet: {cmd.hex()}")
-
-        return all_points
+                buf = buf[pos:] + chunk
+                pos = 0
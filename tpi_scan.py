@@ -0,0 +1,428 @@
+from __future__ import annotations
+
+from tpi_controller2 import TPIController
+import array
+import atexit
+import functools
+import queue
+import sys
+import threading
+from typing import List, Tuple, Optional, Iterator, Dict, NamedTuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Analyzer stopped packet that ends every sweep
+TERMINATOR = b'\xAA\x55\x00\x02\x07\x3F\xB7'
+
+# Open controllers keyed by COM port, reused across scanner lifecycles
+_CONTROLLER_CACHE: Dict[str, TPIController] = {}
+
+
+def shutdown_all() -> None:
+    """Close every cached controller. Registered to run at interpreter exit."""
+    while _CONTROLLER_CACHE:
+        _, tpi = _CONTROLLER_CACHE.popitem()
+        tpi.close()
+
+
+atexit.register(shutdown_all)
+
+
+def extract_point_data(raw_data: bytes, out) -> int:
+    """
+    Copy the measurement payload from a raw analyzer capture into a preallocated buffer.
+
+    Data packets are laid out as AA 55 <len:2> 07 3E <n_points:1> <first_step:4>
+    <n_points floats> <checksum>. The length field reported by the analyzer does not
+    match the body size, so packets are framed by their point count instead.
+
+    Args:
+        raw_data: Raw bytes captured from the serial port
+        out: Writable buffer (memoryview) receiving the little-endian float32 point data
+
+    Returns:
+        Number of bytes written to out
+    """
+    if NUMBA_AVAILABLE:
+        return int(_extract_point_data_jit(np.frombuffer(raw_data, dtype=np.uint8),
+                                           np.frombuffer(out, dtype=np.uint8)))
+
+    raw_view = memoryview(raw_data)
+    written = 0
+    offset = 0
+    end = len(raw_data)
+    while offset + 11 <= end:
+        if (raw_data[offset] == 0xAA and raw_data[offset + 1] == 0x55
+                and raw_data[offset + 4] == 0x07 and raw_data[offset + 5] == 0x3E):
+            data_len = raw_data[offset + 6] * 4
+            data_end = offset + 11 + data_len
+            if data_end > end or written + data_len > len(out):
+                break
+            out[written:written + data_len] = raw_view[offset + 11:data_end]
+            written += data_len
+            offset = data_end + 1  # Skip checksum
+        else:
+            offset += 1
+    return written
+
+
+@njit(cache=True)
+def _extract_point_data_jit(raw: np.ndarray, out: np.ndarray) -> int:
+    """Compiled form of extract_point_data working on uint8 arrays"""
+    written = 0
+    offset = 0
+    end = raw.shape[0]
+    capacity = out.shape[0]
+    while offset + 11 <= end:
+        if (raw[offset] == 0xAA and raw[offset + 1] == 0x55
+                and raw[offset + 4] == 0x07 and raw[offset + 5] == 0x3E):
+            data_len = raw[offset + 6] * 4
+            data_end = offset + 11 + data_len
+            if data_end > end or written + data_len > capacity:
+                break
+            for i in range(data_len):
+                out[written + i] = raw[offset + 11 + i]
+            written += data_len
+            offset = data_end + 1  # Skip checksum
+        else:
+            offset += 1
+    return written
+
+
+if NUMBA_AVAILABLE:
+    # Compile (or load from cache) at import so the first scan does not pay for it
+    _extract_point_data_jit(np.zeros(12, dtype=np.uint8), np.zeros(4, dtype=np.uint8))
+
+
+class Scan(NamedTuple):
+    """
+    One sweep in column form: frequencies in kHz and the value measured at each.
+    Unpacks as (freqs, vals), so it can stand in for the plain array pair.
+    """
+    freqs: np.ndarray
+    vals: np.ndarray
+
+
+def from_tuples(results: List[Tuple[int, float]]) -> Scan:
+    """
+    Convert a list of (frequency_khz, value) tuples into a Scan.
+
+    Args:
+        results: List of tuples containing (frequency_khz, value)
+
+    Returns:
+        Scan with int64 frequencies and float64 values
+    """
+    if np is None:
+        return Scan([freq for freq, _ in results], [value for _, value in results])
+    count = len(results)
+    return Scan(np.fromiter((freq for freq, _ in results), dtype=np.int64, count=count),
+                np.fromiter((value for _, value in results), dtype=np.float64, count=count))
+
+
+def to_tuples(frequencies: np.ndarray, values: np.ndarray) -> List[Tuple[int, float]]:
+    """
+    Convert scan arrays into the list of (frequency_khz, value) tuples used by the VSWR helpers.
+
+    Args:
+        frequencies: Array of frequencies in kHz
+        values: Array of values measured at each frequency
+
+    Returns:
+        List of tuples containing (frequency_khz, value)
+    """
+    if np is None:
+        return list(zip(frequencies, values))
+    return list(zip(frequencies.tolist(), values.tolist()))
+
+
+def decode_points(data, start_khz: int, step_khz: int,
+                  freq_grid: Optional[np.ndarray] = None) -> Scan:
+    """
+    Decode little-endian float32 point data and build the matching frequency axis.
+    Any trailing partial value is ignored.
+
+    Args:
+        data: Buffer holding the extracted point data
+        start_khz: Frequency of the first point in kHz
+        step_khz: Step size in kHz
+        freq_grid: Optional precomputed frequency axis for start_khz/step_khz, sliced
+            instead of building a new one when it covers every decoded point
+
+    Returns:
+        Scan of arrays (frequency_khz as int64, power_dbm as float32), or of a
+        frequency list and an array.array('f') when numpy is not installed
+    """
+    n_aligned = len(data) & ~3
+    if np is None:
+        # Typed 4-byte storage filled in one copy instead of a list of boxed floats
+        float_values = array.array('f')
+        float_values.frombytes(data[:n_aligned])
+        if sys.byteorder == 'big':
+            float_values.byteswap()
+    else:
+        # Whole buffer at once
+        float_values = np.frombuffer(data[:n_aligned], dtype='<f4')
+
+    if freq_grid is not None and len(freq_grid) >= len(float_values):
+        frequencies = freq_grid[:len(float_values)]
+    elif np is None:
+        frequencies = [start_khz + i * step_khz for i in range(len(float_values))]
+    else:
+        frequencies = start_khz + np.arange(float_values.size, dtype=np.int64) * step_khz
+    return Scan(frequencies, float_values)
+
+
+@functools.lru_cache(maxsize=32)
+def calculate_num_points(start_khz, stop_khz, step_khz):
+    """Calculate the number of points for frequency scanning"""
+    span_steps, remainder = divmod(stop_khz - start_khz, step_khz)
+    if remainder:
+        raise ValueError(f"The calculated number of points ({(stop_khz - start_khz) / step_khz + 1}) must be an integer. "
+                         f"Please adjust frequency parameters accordingly.")
+    return span_steps + 1
+
+
+class FrequencyScanner:
+    # Constants that could be parameterized in future if needed
+    RF_POWER_DBM = 0
+    AUTO_RF = True
+    MAX_POINTS_PER_PACKET = 40
+    AVERAGES_PER_POINT = 8
+    CAPTURE_TIMEOUT = 6.0
+
+    def __init__(self, com_port: str, verbose: bool = False):
+        """Initialize the frequency scanner."""
+        self.com_port = com_port
+        self.verbose = verbose
+        self.tpi: Optional[TPIController] = None
+        self.all_raw_data = bytearray()
+        self.num_points = 0
+        self._max_bytes = 0
+        self._freq_grid = None
+        self._grid_key = None
+        self._analyzer_config = None
+
+    def setup(self, start_khz: int, stop_khz: int, step_khz: int, dwell_ms: int) -> None:
+        """
+        Set up the analyzer with the specified parameters.
+        An existing connection is reused and unchanged analyzer parameters are not re-sent.
+        """
+        if self.tpi is None:
+            self.tpi = _CONTROLLER_CACHE.get(self.com_port)
+            if self.tpi is None:
+                if self.verbose:
+                    print("Initializing controller...")
+                self.tpi = TPIController(self.com_port)
+                _CONTROLLER_CACHE[self.com_port] = self.tpi
+            self._analyzer_config = None
+
+        try:
+            if self.verbose:
+                print("Enabling user mode...")
+            self.tpi.enable_user_control()
+
+            if self.verbose:
+                print(f"Setting RF power to {self.RF_POWER_DBM} dBm...")
+            self.tpi.set_rf_power(self.RF_POWER_DBM)
+
+            num_points_calc = calculate_num_points(start_khz, stop_khz, step_khz)
+            self.num_points = num_points_calc
+            self._max_bytes = num_points_calc * 4 + 128
+            # One sample buffer per setup, reused by every sweep
+            if len(self.all_raw_data) != self._max_bytes:
+                self.all_raw_data = bytearray(self._max_bytes)
+
+            # The frequency axis only depends on the setup, so build it once here
+            if np is None:
+                self._freq_grid = [start_khz + i * step_khz for i in range(num_points_calc)]
+            else:
+                self._freq_grid = start_khz + np.arange(num_points_calc, dtype=np.int64) * step_khz
+                self._freq_grid.flags.writeable = False
+            self._grid_key = (start_khz, step_khz)
+
+            analyzer_config = (start_khz, stop_khz, step_khz, dwell_ms)
+            if analyzer_config != self._analyzer_config:
+                if self.verbose:
+                    print("Setting analyzer parameters...")
+                self.tpi.set_analyzer_parameters_v2(
+                    start_khz=start_khz,
+                    stop_khz=stop_khz,
+                    step_khz=step_khz,
+                    dwell_ms=dwell_ms,
+                    num_points=num_points_calc,
+                    auto_rf=self.AUTO_RF,
+                    max_points_per_packet=self.MAX_POINTS_PER_PACKET,
+                    averages_per_point=self.AVERAGES_PER_POINT
+                )
+                self._analyzer_config = analyzer_config
+
+            # Turn detector and RF ON
+            self.tpi.set_detector_state(True)
+            self.tpi.set_rf_output_state(True)
+
+        except Exception as e:
+            self.shutdown()
+            raise e
+
+    def run(self, start_khz: int, step_khz: int) -> Scan:
+        """
+        Run the frequency scan and return the results.
+
+        Returns:
+            Scan of arrays (frequency_khz as int64, power_dbm as float32)
+        """
+        if not self.tpi:
+            raise RuntimeError("Scanner not set up. Call setup() first.")
+
+        try:
+            return self._decode_sweep(self._capture_sweep(), start_khz, step_khz)
+
+        except Exception as e:
+            self.shutdown()
+            raise e
+
+    def run_many(self, start_khz: int, step_khz: int, n: int) -> Iterator[Scan]:
+        """
+        Run n consecutive sweeps, yielding the Scan of each.
+
+        The detector, RF output and analyzer parameters stay armed from setup(), so each
+        sweep only costs the analyzer start command and the capture itself. Captures run
+        on a background thread, so the next sweep is already being received while the
+        caller processes the current one. Don't use the controller until iteration ends.
+        """
+        if not self.tpi:
+            raise RuntimeError("Scanner not set up. Call setup() first.")
+
+        # At most one sweep is captured ahead of the consumer
+        captures = queue.Queue(maxsize=1)
+        stop = threading.Event()
+
+        def hand_over(item) -> bool:
+            while not stop.is_set():
+                try:
+                    captures.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def capture_worker():
+            try:
+                for _ in range(n):
+                    if stop.is_set() or not hand_over(self._capture_sweep()):
+                        break
+            except Exception as e:
+                hand_over(e)
+
+        worker = threading.Thread(target=capture_worker, daemon=True)
+        worker.start()
+        try:
+            for _ in range(n):
+                raw_data = captures.get()
+                if isinstance(raw_data, Exception):
+                    raise raw_data
+                yield self._decode_sweep(raw_data, start_khz, step_khz)
+
+        except Exception:
+            # Let the worker release the port before turning things off
+            stop.set()
+            worker.join()
+            self.shutdown()
+            raise
+        finally:
+            stop.set()
+            worker.join()
+
+    def _capture_sweep(self) -> bytes:
+        """Start the analyzer and capture raw bytes until the analyzer stopped packet arrives"""
+        if self.verbose:
+            print("Starting analyzer...")
+        self.tpi.start_analyzer_v2()
+
+        if self.verbose:
+            print("Receiving analyzer data...")
+        return self.tpi.capture_analyzer_until(TERMINATOR, timeout=self.CAPTURE_TIMEOUT)
+
+    def _decode_sweep(self, raw_data: bytes, start_khz: int, step_khz: int) -> Scan:
+        """Extract and decode the point data of one captured sweep"""
+        raw_view = memoryview(self.all_raw_data)
+        num_bytes = extract_point_data(raw_data, raw_view)
+
+        # Convert accumulated data to float values and the frequency axis
+        freq_grid = self._freq_grid if (start_khz, step_khz) == self._grid_key else None
+        frequencies, float_values = decode_points(raw_view[:num_bytes], start_khz, step_khz, freq_grid)
+        if np is not None:
+            # frombuffer aliases the sample buffer, which the next sweep overwrites
+            float_values = float_values.copy()
+        if self.verbose:
+            # One write for the whole table rather than a print per point
+            print("\n".join(f"{freq:10d} kHz    {value:8.2f} dBm"
+                            for freq, value in to_tuples(frequencies, float_values)))
+
+        return Scan(frequencies, float_values)
+
+    def shutdown(self) -> None:
+        """
+        Turn off RF and the detector and release the connection.
+        The serial port stays open in the controller cache; use reset_port() to close it.
+        """
+        if self.tpi:
+            try:
+                self.tpi.set_rf_output_state(False)
+                self.tpi.set_detector_state(False)
+            except Exception:
+                # Don't hand a connection that failed mid-command to the next scanner
+                self.reset_port(self.com_port)
+                raise
+            finally:
+                self.tpi = None
+                self._analyzer_config = None
+
+    @staticmethod
+    def reset_port(com_port: str) -> None:
+        """
+        Close and forget the cached controller for com_port so the next setup() reopens it.
+        """
+        tpi = _CONTROLLER_CACHE.pop(com_port, None)
+        if tpi:
+            tpi.close()
+
+
+def scan(com_port: str, start_khz: int, stop_khz: int,
+         step_khz: int, dwell_ms: int, verbose: bool = False) -> Scan:
+    """
+    Scan a frequency range once and return power measurements.
+
+    Args:
+        com_port: Serial port identifier (e.g. 'COM5')
+        start_khz: Start frequency in kHz
+        stop_khz: Stop frequency in kHz
+        step_khz: Step size in kHz
+        dwell_ms: Dwell time per point in ms (2-500)
+        verbose: Enable debug printing if True
+
+    Returns:
+        Scan of arrays (frequency_khz as int64, power_dbm as float32)
+    """
+    scanner = FrequencyScanner(com_port, verbose)
+    try:
+        scanner.setup(start_khz, stop_khz, step_khz, dwell_ms)
+        return scanner.run(start_khz, step_khz)
+    finally:
+        scanner.shutdown()